@@ -0,0 +1,346 @@
+"""Benchmark and regression suite for the checker's own hot paths.
+
+The suite runs on a CPU-only Linux box: ``nvidia-smi``, ``nvcc`` and ``wmic``
+are replaced by fake executables placed first on ``PATH`` that simulate any
+number of GPUs and a configurable driver delay.
+
+Usage:
+    python benchmarks.py                    # run and compare with the baseline
+    python benchmarks.py --update-baseline  # run and store a new baseline
+
+The process exits with status 1 when a metric regresses by more than the
+threshold relative to the stored baseline.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import psutil
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6.QtWidgets import QApplication
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(REPO_DIR, "benchmark_baseline.json")
+
+FAKE_NVIDIA_SMI = """#!{python}
+import os
+import sys
+import time
+
+time.sleep(float(os.environ.get("FAKE_DRIVER_DELAY", "0")))
+if any(arg.startswith("--query-compute-apps") for arg in sys.argv):
+    # FAKE_GPU_PIDS lists the PIDs holding GPU 0, e.g. "1234,5678"
+    for pid in filter(None, os.environ.get("FAKE_GPU_PIDS", "").split(",")):
+        print(f"00000000:00:00.0, {{pid}}, 1024")
+    sys.exit(0)
+if not any(arg.startswith("--query-gpu") for arg in sys.argv):
+    sys.exit(0)
+loop_ms = int(sys.argv[sys.argv.index("-lms") + 1]) if "-lms" in sys.argv else None
+while True:
+    for index in range(int(os.environ.get("FAKE_GPU_COUNT", "1"))):
+        print(
+            f"{{index}}, NVIDIA A100-SXM4-80GB, 00000000:{{index:02X}}:00.0, "
+            "535.104.05, 92.00.45.00.06, 81920, 40960, 40960, 50, 30, 65, "
+            "250.00, 400.00, 1410, 1593, P0, 4, 4",
+            flush=True,
+        )
+    if loop_ms is None:
+        break
+    time.sleep(loop_ms / 1000)
+"""
+
+FAKE_NVCC = """#!{python}
+import os
+import time
+
+time.sleep(float(os.environ.get("FAKE_DRIVER_DELAY", "0")))
+print("nvcc: NVIDIA (R) Cuda compiler driver")
+print("Cuda compilation tools, release 12.2, V12.2.140")
+"""
+
+FAKE_WMIC = """#!{python}
+print("Name")
+print("Fake CPU @ 2.60GHz")
+"""
+
+STARTUP_SCRIPT = """
+import os
+import resource
+import sys
+
+spawns = 0
+
+
+def count_spawns(event, args):
+    global spawns
+    if event in ("subprocess.Popen", "os.system"):
+        spawns += 1
+
+
+sys.addaudithook(count_spawns)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, {repo_dir!r})
+from PySide6.QtWidgets import QApplication
+import mlframework_checker
+
+app = QApplication([])
+# The startup framework probes run on a background thread and would be
+# counted against whatever is measured at the time
+window = mlframework_checker.MLFrameworkChecker(
+    interactive=False, check_on_startup=False
+)
+print(spawns, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+# Metrics compared against the baseline, with an absolute noise floor that a
+# regression has to exceed on top of the relative threshold.
+REGRESSION_METRICS = {
+    "p50_ms": 1.0,
+    "p95_ms": 10.0,
+    "subprocesses_per_call": 0.0,
+    "alloc_peak_kb": 16.0,
+    "rss_growth_mb": 4.0,
+    "peak_rss_mb": 4.0,
+}
+
+_spawn_count = 0
+
+
+def _count_spawns(event, args):
+    global _spawn_count
+    if event in ("subprocess.Popen", "os.system"):
+        _spawn_count += 1
+
+
+def install_fake_tools(directory):
+    """Write fake GPU tools to ``directory`` and put it first on PATH."""
+    for name, source in (
+        ("nvidia-smi", FAKE_NVIDIA_SMI),
+        ("nvcc", FAKE_NVCC),
+        ("wmic", FAKE_WMIC),
+    ):
+        path = os.path.join(directory, name)
+        with open(path, "w") as f:
+            f.write(source.format(python=sys.executable))
+        os.chmod(path, 0o755)
+    os.environ["PATH"] = directory + os.pathsep + os.environ.get("PATH", "")
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(latencies_ms, spawns, calls, alloc_peak_kb):
+    return {
+        "p50_ms": round(percentile(latencies_ms, 0.50), 3),
+        "p95_ms": round(percentile(latencies_ms, 0.95), 3),
+        "p99_ms": round(percentile(latencies_ms, 0.99), 3),
+        "max_ms": round(max(latencies_ms), 3),
+        "subprocesses_per_call": round(spawns / calls, 2),
+        "alloc_peak_kb": round(alloc_peak_kb, 1),
+    }
+
+
+def measure(function, repeat, warmup=1):
+    """Time ``function`` in-process and record spawns, allocations and RSS.
+
+    RSS is reported as the growth of the current RSS over the benchmark.
+    The process-wide high-water mark would only ever rise from one
+    benchmark to the next and depend on the order they run in.
+    """
+    process = psutil.Process()
+    rss_before = process.memory_info().rss
+    for _ in range(warmup):
+        function()
+
+    latencies_ms = []
+    spawns_before = _spawn_count
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        latencies_ms.append((time.perf_counter() - start) * 1000)
+    spawns = _spawn_count - spawns_before
+
+    # Allocation tracking slows Python down, so it gets its own call
+    tracemalloc.start()
+    function()
+    _, alloc_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    metrics = summarize(latencies_ms, spawns, repeat, alloc_peak / 1024)
+    rss_growth = process.memory_info().rss - rss_before
+    metrics["rss_growth_mb"] = round(rss_growth / 1024**2, 1)
+    return metrics
+
+
+def measure_startup(repeat, work_dir):
+    """Time a fresh interpreter importing the checker and building the window.
+
+    Every run is its own process, so its peak RSS is reported.
+    """
+    script = STARTUP_SCRIPT.format(repo_dir=REPO_DIR)
+    latencies_ms = []
+    spawns = 0
+    peak_rss_kb = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = subprocess.check_output(
+            [sys.executable, "-c", script], cwd=work_dir, text=True
+        )
+        latencies_ms.append((time.perf_counter() - start) * 1000)
+        child_spawns, child_rss_kb = output.split()[-2:]
+        spawns += int(child_spawns)
+        peak_rss_kb = max(peak_rss_kb, int(child_rss_kb))
+    metrics = summarize(latencies_ms, spawns, repeat, 0.0)
+    metrics["peak_rss_mb"] = round(peak_rss_kb / 1024, 1)
+    return metrics
+
+
+def run_benchmarks(repeat=20, gpu_counts=(1, 8, 64), slow_driver_delay=0.2):
+    import mlframework_checker
+
+    sys.addaudithook(_count_spawns)
+    app = QApplication.instance() or QApplication([])
+    results = {}
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        install_fake_tools(work_dir)
+        os.environ["FAKE_DRIVER_DELAY"] = "0"
+        os.environ["FAKE_GPU_COUNT"] = "8"
+
+        checker = mlframework_checker.MLFrameworkChecker(
+            interactive=False, check_on_startup=False
+        )
+        checker.update_timer.stop()
+
+        for count in gpu_counts:
+            os.environ["FAKE_GPU_COUNT"] = str(count)
+            results[f"get_gpu_info[gpus={count}]"] = measure(
+                checker.get_gpu_info, repeat
+            )
+
+        os.environ["FAKE_GPU_COUNT"] = "8"
+        os.environ["FAKE_DRIVER_DELAY"] = str(slow_driver_delay)
+        results["get_gpu_info[gpus=8,slow_driver]"] = measure(
+            checker.get_gpu_info, max(3, repeat // 4)
+        )
+        os.environ["FAKE_DRIVER_DELAY"] = "0"
+
+        results["get_cuda_version"] = measure(checker.get_cuda_version, repeat)
+        results["check_system_specs[gpus=8]"] = measure(
+            checker.check_system_specs, repeat
+        )
+
+        def gui_refresh():
+            checker.update_system_info()
+            app.processEvents()
+
+        results["gui_refresh[gpus=8]"] = measure(gui_refresh, repeat)
+
+        os.environ["FAKE_GPU_PIDS"] = str(os.getpid())
+
+        def process_tick():
+            # Start from a fresh tick so the compute-apps query is included
+            checker.latest_gpu_processes = None
+            checker.process_rows(top_n=15)
+
+        results["process_attribution[top=15]"] = measure(process_tick, repeat)
+        results["startup"] = measure_startup(max(3, repeat // 4), work_dir)
+
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Return a description of every metric that regressed past the threshold."""
+    regressions = []
+    for name, metrics in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        for metric, noise_floor in REGRESSION_METRICS.items():
+            old, new = base.get(metric), metrics.get(metric)
+            if old is None or new is None:
+                continue
+            if new > old * (1 + threshold) + noise_floor:
+                regressions.append(f"{name}: {metric} {old} -> {new}")
+    return regressions
+
+
+def format_results(results):
+    header = (
+        f"{'Benchmark':<34} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+        f"{'Procs':>6} {'Alloc KB':>9} {'RSS +MB':>8} {'Peak MB':>8}"
+    )
+    lines = [header, "-" * len(header)]
+    for name, metrics in results.items():
+        growth = metrics.get("rss_growth_mb")
+        peak = metrics.get("peak_rss_mb")
+        lines.append(
+            f"{name:<34} {metrics['p50_ms']:>9.2f} {metrics['p95_ms']:>9.2f} "
+            f"{metrics['p99_ms']:>9.2f} {metrics['subprocesses_per_call']:>6} "
+            f"{metrics['alloc_peak_kb']:>9.1f} "
+            f"{'-' if growth is None else format(growth, '.1f'):>8} "
+            f"{'-' if peak is None else format(peak, '.1f'):>8}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ML Framework Checker benchmarks")
+    parser.add_argument("--repeat", type=int, default=20, help="Calls per benchmark")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline file")
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Store the results as the new baseline instead of comparing",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="Allowed relative regression before failing (default: 0.25)",
+    )
+    parser.add_argument("--output", metavar="FILE", help="Write results as JSON")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(repeat=args.repeat)
+    print(format_results(results))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline first.")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print("\nPerformance regressions:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    print("\nNo regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,419 @@
+"""Cold-start profiler for ML frameworks.
+
+Measures how long a fresh process takes to become ready with a framework:
+every run starts a new interpreter under ``-X importtime`` and records the
+import time (split by top-level package), RSS after the import, the latency
+of a first small CPU tensor operation and the number of OS threads after the
+import and after that operation, which is where intra-op thread pools appear.
+Results are medians over the runs.
+
+Usage:
+    python coldstart.py                          # torch, tensorflow, jax, numpy
+    python coldstart.py torch --runs 10 --json torch-2.3.json
+    python coldstart.py torch --baseline torch-2.2.json
+    python coldstart.py torch --python /opt/venvs/torch-2.2/bin/python
+
+Warm-up runs (``--warmup``) fill the bytecode and page caches first, so the
+numbers describe a fresh process on a node that has run the framework before.
+The process exits with status 1 when a metric regresses against the baseline.
+"""
+
+import argparse
+import json
+import math
+import statistics
+import subprocess
+import sys
+
+from history import (
+    DEFAULT_HISTORY_PATH,
+    TRACKED_PACKAGES,
+    HistoryStore,
+    mann_whitney_less,
+)
+
+FIRST_OPS = {
+    "torch": "torch.mm(torch.ones(256, 256), torch.ones(256, 256)).sum().item()",
+    "tensorflow": (
+        "tensorflow.linalg.matmul("
+        "tensorflow.ones((256, 256)), tensorflow.ones((256, 256))).numpy()"
+    ),
+    "jax": (
+        "import jax.numpy\n"
+        "(jax.numpy.ones((256, 256)) @ jax.numpy.ones((256, 256)))"
+        ".block_until_ready()"
+    ),
+    "numpy": "(numpy.ones((256, 256)) @ numpy.ones((256, 256))).sum()",
+}
+METRICS = (
+    ("import_s", "s"),
+    ("first_op_s", "s"),
+    ("rss_mb", "MB"),
+    ("threads_after_import", "threads"),
+    ("threads_after_first_op", "threads"),
+)
+# Relative increase and absolute noise floor a metric must exceed to regress
+REGRESSION_METRICS = {"import_s": 0.01, "first_op_s": 0.005, "rss_mb": 5.0}
+# Significance level of the Mann-Whitney test behind a reported regression
+ALPHA = 0.05
+RESULT_MARKER = "__coldstart_result__:"
+IMPORT_MARKER = "__coldstart_import__"
+
+# Runs in the profiled interpreter, which may be another virtualenv, so it
+# only uses the standard library (psutil is a fallback off Linux).
+CHILD_SCRIPT = """
+import json
+import sys
+import time
+
+
+def usage():
+    try:
+        with open("/proc/self/status") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line)
+        return int(fields["VmRSS"].split()[0]) * 1024, int(fields["Threads"])
+    except OSError:
+        import psutil
+
+        process = psutil.Process()
+        return process.memory_info().rss, process.num_threads()
+
+
+name, first_op = sys.argv[1], sys.argv[2]
+rss_before, threads_before = usage()
+sys.stderr.write("\\n{marker}\\n")
+sys.stderr.flush()
+start = time.perf_counter()
+try:
+    # __import__ goes through the import path that -X importtime reports on
+    __import__(name)
+    module = sys.modules[name]
+except ImportError:
+    print({result!r} + json.dumps({{"installed": False}}))
+    sys.exit(0)
+import_s = time.perf_counter() - start
+sys.stderr.write("\\n{marker}\\n")
+sys.stderr.flush()
+rss_import, threads_import = usage()
+
+first_op_s = None
+if first_op:
+    start = time.perf_counter()
+    exec(first_op, {{name: module}})
+    first_op_s = time.perf_counter() - start
+rss_op, threads_op = usage()
+
+print(
+    {result!r}
+    + json.dumps(
+        {{
+            "installed": True,
+            "version": getattr(module, "__version__", None),
+            "import_s": import_s,
+            "first_op_s": first_op_s,
+            "rss_mb": rss_import / 1024**2,
+            "rss_before_mb": rss_before / 1024**2,
+            "rss_after_first_op_mb": rss_op / 1024**2,
+            "threads_before": threads_before,
+            "threads_after_import": threads_import,
+            "threads_after_first_op": threads_op,
+        }}
+    )
+)
+""".format(marker=IMPORT_MARKER, result=RESULT_MARKER)
+
+# Reports the configuration of the profiled interpreter for --record
+CONFIG_SCRIPT = """
+import json
+import platform
+from importlib import metadata
+
+config = {{"python": platform.python_version(), "platform": platform.platform()}}
+for package in {packages!r}:
+    try:
+        config[package] = metadata.version(package)
+    except metadata.PackageNotFoundError:
+        config[package] = None
+print(json.dumps(config))
+""".format(packages=TRACKED_PACKAGES)
+
+
+class ColdStartError(Exception):
+    pass
+
+
+def parse_importtime(lines):
+    """Sum ``-X importtime`` self times (in seconds) by top-level package."""
+    packages = {}
+    for line in lines:
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:") :].split("|")
+        # Skips the "self [us] | cumulative | imported package" header
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        package = fields[2].strip().split(".")[0]
+        packages[package] = packages.get(package, 0.0) + int(fields[0]) / 1e6
+    return packages
+
+
+def profile_once(name, python=sys.executable, timeout=600):
+    """Import ``name`` in a fresh interpreter and return one measurement."""
+    completed = subprocess.run(
+        [python, "-X", "importtime", "-c", CHILD_SCRIPT, name, FIRST_OPS.get(name, "")],
+        capture_output=True,
+        text=True,
+        timeout=timeout,
+    )
+    result = None
+    for line in completed.stdout.splitlines():
+        if line.startswith(RESULT_MARKER):
+            result = json.loads(line[len(RESULT_MARKER) :])
+    if result is None:
+        stderr = completed.stderr.strip().splitlines()
+        raise ColdStartError(
+            f"{name}: " + (stderr[-1] if stderr else f"exit {completed.returncode}")
+        )
+    if result["installed"]:
+        # Only count the imports made by the framework itself
+        sections = completed.stderr.split(IMPORT_MARKER)
+        result["packages"] = parse_importtime(
+            sections[1].splitlines() if len(sections) > 2 else []
+        )
+    return result
+
+
+def profile_framework(name, runs=5, warmup=1, python=sys.executable):
+    """Profile ``runs`` cold starts of a framework and return their medians.
+
+    Returns None when the framework is not installed in ``python``.
+    """
+    for _ in range(warmup):
+        if not profile_once(name, python)["installed"]:
+            return None
+    samples = [profile_once(name, python) for _ in range(runs)]
+    if not samples[0]["installed"]:
+        return None
+
+    summary = {
+        "framework": name,
+        "version": samples[0]["version"],
+        "runs": runs,
+        "samples": {
+            metric: [sample[metric] for sample in samples]
+            for metric, _ in METRICS
+            if samples[0][metric] is not None
+        },
+    }
+    for metric, values in summary["samples"].items():
+        summary[metric] = statistics.median(values)
+    packages = {}
+    for sample in samples:
+        for package, seconds in sample["packages"].items():
+            packages.setdefault(package, []).append(seconds)
+    summary["packages"] = dict(
+        sorted(
+            (
+                # Packages missing from a run imported nothing in it
+                (package, statistics.median(values + [0.0] * (runs - len(values))))
+                for package, values in packages.items()
+            ),
+            key=lambda item: item[1],
+            reverse=True,
+        )
+    )
+    return summary
+
+
+def minimum_runs(baseline_runs, alpha=ALPHA):
+    """Fewest runs whose exact Mann-Whitney p-value can fall below ``alpha``.
+
+    The smallest attainable one-sided p-value, with every run slower than
+    every baseline run, is ``1 / comb(baseline_runs + runs, runs)``.
+    """
+    runs = 1
+    while 1 / math.comb(baseline_runs + runs, runs) >= alpha:
+        runs += 1
+    return runs
+
+
+def compare(results, baseline, threshold=0.1, alpha=ALPHA):
+    """Describe every metric that got significantly worse than the baseline.
+
+    A metric regresses when its median grows by more than ``threshold`` plus
+    the noise floor and the runs are significantly slower (Mann-Whitney U).
+    Frameworks missing from either side are reported as missing.
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if result is None:
+            regressions.append(
+                f"{name}: not installed (baseline has {base['version']})"
+            )
+            continue
+        for metric, noise_floor in REGRESSION_METRICS.items():
+            old, new = base.get(metric), result.get(metric)
+            if old is None or new is None:
+                continue
+            # The baseline being stochastically smaller means we got slower
+            p_value = mann_whitney_less(
+                base["samples"][metric], result["samples"][metric]
+            )
+            if new > old * (1 + threshold) + noise_floor and p_value < alpha:
+                regressions.append(
+                    f"{name}: {metric} {old:.3f} -> {new:.3f} "
+                    f"({base['version']} -> {result['version']}, p={p_value:.3f})"
+                )
+    return regressions
+
+
+def format_results(results, top_packages=5):
+    lines = [
+        f"{'Framework':<12} {'Version':<14} {'Import s':>9} {'First op s':>11} "
+        f"{'RSS MB':>8} {'Threads':>9}"
+    ]
+    for name, result in results.items():
+        if result is None:
+            lines.append(f"{name:<12} not installed")
+            continue
+        first_op = result.get("first_op_s")
+        threads = (
+            f"{result['threads_after_import']:.0f}/"
+            f"{result.get('threads_after_first_op', 0):.0f}"
+        )
+        lines.append(
+            f"{name:<12} {str(result['version']):<14} {result['import_s']:>9.3f} "
+            f"{'-' if first_op is None else format(first_op, '.4f'):>11} "
+            f"{result['rss_mb']:>8.1f} {threads:>9}"
+        )
+        slowest = list(result["packages"].items())[:top_packages]
+        if slowest:
+            lines.append(
+                "  slowest imports: "
+                + ", ".join(f"{package} {seconds:.3f}s" for package, seconds in slowest)
+            )
+    return "\n".join(lines)
+
+
+def interpreter_configuration(python=sys.executable, timeout=60):
+    """Return the history configuration of the ``python`` interpreter."""
+    completed = subprocess.run(
+        [python, "-c", CONFIG_SCRIPT],
+        capture_output=True,
+        text=True,
+        timeout=timeout,
+    )
+    if completed.returncode:
+        stderr = completed.stderr.strip().splitlines()
+        raise ColdStartError(stderr[-1] if stderr else f"exit {completed.returncode}")
+    return json.loads(completed.stdout)
+
+
+def history_samples(results):
+    samples = []
+    for name, result in results.items():
+        if result is None:
+            continue
+        for metric, unit in METRICS:
+            for value in result["samples"].get(metric, []):
+                samples.append((name, metric, value, unit))
+    return samples
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ML framework cold-start profiler")
+    parser.add_argument(
+        "frameworks",
+        nargs="*",
+        default=list(FIRST_OPS),
+        metavar="MODULE",
+        help="Modules to profile (default: " + ", ".join(FIRST_OPS) + ")",
+    )
+    parser.add_argument("--runs", type=int, default=5, help="Measured runs")
+    parser.add_argument(
+        "--warmup", type=int, default=1, help="Unmeasured runs first (default: 1)"
+    )
+    parser.add_argument(
+        "--python",
+        default=sys.executable,
+        help="Interpreter to profile, e.g. another virtualenv",
+    )
+    parser.add_argument("--json", metavar="FILE", help="Write results as JSON")
+    parser.add_argument(
+        "--baseline", metavar="FILE", help="Compare with results saved by --json"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Allowed relative regression before failing (default: 0.1)",
+    )
+    parser.add_argument(
+        "--record",
+        nargs="?",
+        const=DEFAULT_HISTORY_PATH,
+        metavar="FILE",
+        help=f"Append the runs to the history database (default: {DEFAULT_HISTORY_PATH})",
+    )
+    args = parser.parse_args(argv)
+    if args.runs < 1:
+        parser.error("--runs must be at least 1")
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        for name in args.frameworks:
+            if not baseline.get(name):
+                continue
+            needed = minimum_runs(baseline[name]["runs"])
+            if args.runs < needed:
+                parser.error(
+                    f"--runs {args.runs} cannot show a significant regression "
+                    f"against the {baseline[name]['runs']} baseline runs of {name}; "
+                    f"use --runs {needed} or more"
+                )
+
+    results = {}
+    for name in args.frameworks:
+        try:
+            results[name] = profile_framework(
+                name, runs=args.runs, warmup=args.warmup, python=args.python
+            )
+        except (ColdStartError, subprocess.TimeoutExpired, OSError) as e:
+            print(f"Failed to profile {name}: {e}", file=sys.stderr)
+            return 2
+    print(format_results(results))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.record:
+        # Every key comes from the profiled interpreter, not this one
+        try:
+            config = interpreter_configuration(args.python)
+        except (ColdStartError, subprocess.TimeoutExpired, OSError, ValueError) as e:
+            print(f"Failed to read the configuration of {args.python}: {e}")
+            return 2
+        config["python_executable"] = args.python
+        for name, result in results.items():
+            if result is not None:
+                config.setdefault(name, result["version"])
+        with HistoryStore(args.record) as store:
+            store.record_run("coldstart", history_samples(results), config)
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print("\nCold-start regressions:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("\nNo cold-start regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
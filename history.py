@@ -0,0 +1,390 @@
+"""Local SQLite history of check results and node performance probes.
+
+Every recorded run stores the host, a timestamp, the configuration at the time
+(framework, CUDA and driver versions) and any number of measurement samples.
+``compare`` looks for statistically significant drops between runs on the same
+host and lists the configuration changes that happened in between.
+
+Usage:
+    python history.py runs                 # list recent runs for this host
+    python history.py compare              # latest run vs the one before it
+    python history.py compare --baseline-runs 5 --min-drop 0.1
+"""
+
+import argparse
+import functools
+import json
+import math
+import os
+import platform
+import socket
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from importlib import metadata
+
+DEFAULT_HISTORY_PATH = os.path.join(
+    os.path.expanduser("~"), ".mlframework_checker", "history.db"
+)
+# Storage throughput is probed next to the history database: the temporary
+# directory is often tmpfs, where fsync is a no-op and reads never leave RAM
+DEFAULT_STORAGE_DIR = os.path.dirname(DEFAULT_HISTORY_PATH)
+TRACKED_PACKAGES = ("torch", "tensorflow", "numpy")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    host TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    kind TEXT NOT NULL,
+    config TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS measurements (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    host TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    component TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    value REAL NOT NULL,
+    unit TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_host_timestamp ON runs(host, timestamp);
+CREATE INDEX IF NOT EXISTS idx_measurements_host_component
+    ON measurements(host, component, metric, timestamp);
+CREATE INDEX IF NOT EXISTS idx_measurements_timestamp ON measurements(timestamp);
+"""
+
+
+class HistoryStore:
+    """Append-only store of runs and their measurement samples."""
+
+    def __init__(self, path=DEFAULT_HISTORY_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def close(self):
+        self.connection.close()
+
+    def record_run(self, kind, samples, config, host=None, timestamp=None):
+        """Store a run; ``samples`` are (component, metric, value, unit) tuples."""
+        host = host or socket.gethostname()
+        timestamp = timestamp if timestamp is not None else time.time()
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO runs (host, timestamp, kind, config) VALUES (?, ?, ?, ?)",
+                (host, timestamp, kind, json.dumps(config, sort_keys=True)),
+            )
+            run_id = cursor.lastrowid
+            self.connection.executemany(
+                "INSERT INTO measurements "
+                "(run_id, host, timestamp, component, metric, value, unit) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (run_id, host, timestamp, component, metric, value, unit)
+                    for component, metric, value, unit in samples
+                ],
+            )
+        return run_id
+
+    def runs(self, host=None, kind=None, limit=20):
+        """Return the most recent runs first as dictionaries."""
+        query = "SELECT id, host, timestamp, kind, config FROM runs WHERE host = ?"
+        params = [host or socket.gethostname()]
+        if kind:
+            query += " AND kind = ?"
+            params.append(kind)
+        query += " ORDER BY timestamp DESC, id DESC LIMIT ?"
+        params.append(limit)
+        return [
+            {
+                "id": run_id,
+                "host": run_host,
+                "timestamp": timestamp,
+                "kind": run_kind,
+                "config": json.loads(config),
+            }
+            for run_id, run_host, timestamp, run_kind, config in self.connection.execute(
+                query, params
+            )
+        ]
+
+    def samples(self, run_ids):
+        """Map (component, metric) to the sample values of the given runs."""
+        placeholders = ", ".join("?" for _ in run_ids)
+        result = {}
+        for component, metric, value in self.connection.execute(
+            "SELECT component, metric, value FROM measurements "
+            f"WHERE run_id IN ({placeholders})",
+            list(run_ids),
+        ):
+            result.setdefault((component, metric), []).append(value)
+        return result
+
+
+@functools.lru_cache(maxsize=None)
+def _u_distribution(m, n):
+    """Counts of each Mann-Whitney U value for sample sizes m and n."""
+    if m == 0 or n == 0:
+        return (1,)
+    counts = [0] * (m * n + 1)
+    # The largest observation either belongs to the first sample, beating
+    # all n values of the second one, or to the second sample.
+    for u, count in enumerate(_u_distribution(m - 1, n)):
+        counts[u + n] += count
+    for u, count in enumerate(_u_distribution(m, n - 1)):
+        counts[u] += count
+    return tuple(counts)
+
+
+def mann_whitney_less(current, baseline):
+    """One-sided p-value that ``current`` is stochastically smaller.
+
+    Exact for small samples, normal approximation otherwise. Ties count as
+    half a win and are rounded conservatively.
+    """
+    m, n = len(current), len(baseline)
+    if not m or not n:
+        return 1.0
+    u = sum(1.0 if x > y else 0.5 if x == y else 0.0 for x in current for y in baseline)
+    if m * n <= 400:
+        counts = _u_distribution(m, n)
+        return sum(counts[: math.ceil(u) + 1]) / math.comb(m + n, m)
+    mean = m * n / 2
+    sigma = math.sqrt(m * n * (m + n + 1) / 12)
+    return statistics.NormalDist().cdf((u + 0.5 - mean) / sigma)
+
+
+def config_changes(old, new):
+    """Describe configuration keys that differ between two runs."""
+    changes = []
+    for key in sorted(set(old) | set(new)):
+        if old.get(key) != new.get(key):
+            changes.append(f"{key}: {old.get(key)} -> {new.get(key)}")
+    return changes
+
+
+def compare_runs(store, host=None, baseline_runs=1, alpha=0.05, min_drop=0.05):
+    """Compare the latest performance run with the ones before it.
+
+    Returns a dictionary with the compared run ids, every metric that dropped
+    significantly and the configuration changes in between, or None when
+    there are not enough runs yet.
+    """
+    runs = store.runs(host=host, kind="performance", limit=baseline_runs + 1)
+    if len(runs) < 2:
+        return None
+    current_run, previous_runs = runs[0], runs[1:]
+    current = store.samples([current_run["id"]])
+    baseline = store.samples([run["id"] for run in previous_runs])
+
+    drops = []
+    for key in sorted(current):
+        if key not in baseline:
+            continue
+        old_median = statistics.median(baseline[key])
+        new_median = statistics.median(current[key])
+        if old_median <= 0:
+            continue
+        drop = 1 - new_median / old_median
+        p_value = mann_whitney_less(current[key], baseline[key])
+        if drop >= min_drop and p_value < alpha:
+            component, metric = key
+            drops.append(
+                {
+                    "component": component,
+                    "metric": metric,
+                    "baseline": old_median,
+                    "current": new_median,
+                    "drop": drop,
+                    "p_value": p_value,
+                }
+            )
+
+    return {
+        "current_run": current_run["id"],
+        "baseline_runs": [run["id"] for run in previous_runs],
+        "drops": drops,
+        "config_changes": config_changes(
+            previous_runs[0]["config"], current_run["config"]
+        ),
+    }
+
+
+def collect_configuration(extra=None):
+    config = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+    for package in TRACKED_PACKAGES:
+        try:
+            config[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            config[package] = None
+    if extra:
+        config.update(extra)
+    return config
+
+
+def _timed_repeat(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def run_performance_probes(repeat=5, storage_dir=DEFAULT_STORAGE_DIR):
+    """Run the node performance probes and return measurement samples.
+
+    Storage throughput is measured with a file in ``storage_dir``.
+    """
+    samples = []
+
+    try:
+        import numpy as np
+
+        size = 512
+        a = np.random.rand(size, size).astype(np.float32)
+        b = np.random.rand(size, size).astype(np.float32)
+        a @ b  # warm up BLAS threads
+        for seconds in _timed_repeat(lambda: a @ b, repeat):
+            samples.append(
+                ("cpu", "gemm_gflops", 2 * size**3 / seconds / 1e9, "GFLOP/s")
+            )
+    except ImportError:
+        pass
+
+    buffer_size = 64 * 1024**2
+    source = bytearray(buffer_size)
+    target = bytearray(buffer_size)
+
+    def copy():
+        target[:] = source
+
+    copy()
+    for seconds in _timed_repeat(copy, repeat):
+        # A copy reads and writes every byte once
+        samples.append(
+            ("memory", "copy_bandwidth", 2 * buffer_size / seconds / 1e9, "GB/s")
+        )
+
+    os.makedirs(storage_dir, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=storage_dir) as directory:
+        path = os.path.join(directory, "probe.bin")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            with open(path, "wb") as f:
+                f.write(source)
+                f.flush()
+                os.fsync(f.fileno())
+            write_seconds = time.perf_counter() - start
+
+            if hasattr(os, "posix_fadvise"):
+                # Drop the file from the page cache so the read hits storage
+                with open(path, "rb") as f:
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+            start = time.perf_counter()
+            with open(path, "rb") as f:
+                while f.read(8 * 1024**2):
+                    pass
+            read_seconds = time.perf_counter() - start
+
+            samples.append(
+                ("storage", "write_mbps", buffer_size / write_seconds / 1e6, "MB/s")
+            )
+            samples.append(
+                ("storage", "read_mbps", buffer_size / read_seconds / 1e6, "MB/s")
+            )
+
+    return samples
+
+
+def format_comparison(result):
+    if result is None:
+        return "Not enough performance runs to compare; record at least two."
+    lines = [
+        f"Run {result['current_run']} vs baseline runs "
+        + ", ".join(str(run_id) for run_id in result["baseline_runs"])
+    ]
+    if result["drops"]:
+        lines.append("Significant drops:")
+        for drop in result["drops"]:
+            lines.append(
+                f"  {drop['component']}.{drop['metric']}: "
+                f"{drop['baseline']:.2f} -> {drop['current']:.2f} "
+                f"(-{drop['drop']:.1%}, p={drop['p_value']:.3f})"
+            )
+    else:
+        lines.append("No significant drops.")
+    if result["config_changes"]:
+        lines.append("Configuration changes between runs:")
+        lines.extend(f"  {change}" for change in result["config_changes"])
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ML Framework Checker history")
+    parser.add_argument("--db", default=DEFAULT_HISTORY_PATH, help="History database")
+    parser.add_argument("--host", help="Host to inspect (default: this host)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    runs_parser = subparsers.add_parser("runs", help="List recent runs")
+    runs_parser.add_argument("--limit", type=int, default=20)
+
+    compare_parser = subparsers.add_parser(
+        "compare", help="Flag significant drops in the latest performance run"
+    )
+    compare_parser.add_argument(
+        "--baseline-runs",
+        type=int,
+        default=1,
+        help="Number of earlier runs pooled into the baseline (default: 1)",
+    )
+    compare_parser.add_argument(
+        "--alpha", type=float, default=0.05, help="Significance level"
+    )
+    compare_parser.add_argument(
+        "--min-drop",
+        type=float,
+        default=0.05,
+        help="Smallest relative drop worth reporting (default: 0.05)",
+    )
+    args = parser.parse_args(argv)
+
+    with HistoryStore(args.db) as store:
+        if args.command == "runs":
+            for run in store.runs(host=args.host, limit=args.limit):
+                when = datetime.fromtimestamp(run["timestamp"]).isoformat(
+                    timespec="seconds"
+                )
+                print(f"{run['id']:>6}  {when}  {run['kind']:<14} {run['host']}")
+            return 0
+
+        result = compare_runs(
+            store,
+            host=args.host,
+            baseline_runs=args.baseline_runs,
+            alpha=args.alpha,
+            min_drop=args.min_drop,
+        )
+        print(format_comparison(result))
+        return 1 if result and result["drops"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,235 @@
+"""Lightweight span-based instrumentation for the checker's own probes.
+
+Spans record wall time, thread CPU time, the number of subprocesses spawned
+and the RSS delta of the checker process. Recording is off by default; while
+disabled ``span()`` returns a shared no-op context manager and ``traced``
+functions call straight through, so instrumented code pays only an attribute
+lookup.
+"""
+
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import nullcontext
+
+import psutil
+
+_NULL_SPAN = nullcontext()
+
+
+class Span:
+    __slots__ = (
+        "name",
+        "category",
+        "start_ns",
+        "duration_ns",
+        "cpu_ns",
+        "subprocesses",
+        "rss_delta",
+        "thread_id",
+    )
+
+    def __init__(
+        self,
+        name,
+        category,
+        start_ns,
+        duration_ns,
+        cpu_ns=0,
+        subprocesses=0,
+        rss_delta=0,
+        thread_id=None,
+    ):
+        self.name = name
+        self.category = category
+        self.start_ns = start_ns
+        self.duration_ns = duration_ns
+        self.cpu_ns = cpu_ns
+        self.subprocesses = subprocesses
+        self.rss_delta = rss_delta
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+
+
+class _ActiveSpan:
+    __slots__ = ("profiler", "name", "category", "start", "cpu", "spawns", "rss")
+
+    def __init__(self, profiler, name, category):
+        self.profiler = profiler
+        self.name = name
+        self.category = category
+
+    def __enter__(self):
+        self.rss = self.profiler._rss()
+        self.spawns = self.profiler.subprocess_count
+        self.cpu = time.thread_time_ns()
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        end = time.perf_counter_ns()
+        cpu = time.thread_time_ns() - self.cpu
+        profiler = self.profiler
+        profiler._append(
+            Span(
+                self.name,
+                self.category,
+                self.start,
+                end - self.start,
+                cpu,
+                profiler.subprocess_count - self.spawns,
+                profiler._rss() - self.rss,
+            )
+        )
+        return False
+
+
+class Profiler:
+    """Collects spans while enabled and exports them as a trace or table."""
+
+    def __init__(self):
+        self.enabled = False
+        self.spans = []
+        self.origin_ns = time.perf_counter_ns()
+        self._lock = threading.Lock()
+        # Spawns are counted per thread: the audit event fires in the thread
+        # that starts the process, so concurrent spans do not see each other's
+        self._spawns = threading.local()
+        self._process = None
+        self._audit_hook_installed = False
+
+    def enable(self):
+        if not self._audit_hook_installed:
+            # Audit hooks cannot be removed, so the hook itself checks the flag
+            sys.addaudithook(self._audit)
+            self._audit_hook_installed = True
+        self._process = psutil.Process()
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self.spans = []
+
+    @property
+    def subprocess_count(self):
+        """Subprocesses spawned by the calling thread while enabled."""
+        return getattr(self._spawns, "count", 0)
+
+    def _audit(self, event, args):
+        if self.enabled and event in ("subprocess.Popen", "os.system"):
+            self._spawns.count = self.subprocess_count + 1
+
+    def _rss(self):
+        try:
+            return self._process.memory_info().rss
+        except (psutil.Error, AttributeError):
+            return 0
+
+    def _append(self, span):
+        with self._lock:
+            self.spans.append(span)
+
+    def span(self, name, category="probe"):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _ActiveSpan(self, name, category)
+
+    def traced(self, name=None, category="probe"):
+        """Decorator recording a span around every call of the function."""
+
+        def decorator(function):
+            span_name = name or function.__name__
+
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                with _ActiveSpan(self, span_name, category):
+                    return function(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def add_span(self, name, start_ns, end_ns, category="probe"):
+        """Record a span measured outside the profiler, e.g. module imports."""
+        if self.enabled:
+            self._append(Span(name, category, start_ns, end_ns - start_ns))
+
+    def to_chrome_trace(self):
+        pid = os.getpid()
+        with self._lock:
+            spans = list(self.spans)
+        events = [
+            {
+                "name": span.name,
+                "cat": span.category,
+                "ph": "X",
+                "ts": (span.start_ns - self.origin_ns) / 1000,
+                "dur": span.duration_ns / 1000,
+                "pid": pid,
+                "tid": span.thread_id,
+                "args": {
+                    "cpu_ms": round(span.cpu_ns / 1e6, 3),
+                    "subprocesses": span.subprocesses,
+                    "rss_delta_kb": span.rss_delta // 1024,
+                },
+            }
+            for span in spans
+        ]
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_chrome_trace(), f)
+
+    def summary(self):
+        """Aggregate spans by name, ordered by total wall time."""
+        rows = {}
+        with self._lock:
+            spans = list(self.spans)
+        for span in spans:
+            row = rows.setdefault(
+                span.name,
+                {
+                    "name": span.name,
+                    "category": span.category,
+                    "calls": 0,
+                    "wall_ms": 0.0,
+                    "max_ms": 0.0,
+                    "cpu_ms": 0.0,
+                    "subprocesses": 0,
+                    "rss_delta_kb": 0,
+                },
+            )
+            wall_ms = span.duration_ns / 1e6
+            row["calls"] += 1
+            row["wall_ms"] += wall_ms
+            row["max_ms"] = max(row["max_ms"], wall_ms)
+            row["cpu_ms"] += span.cpu_ns / 1e6
+            row["subprocesses"] += span.subprocesses
+            row["rss_delta_kb"] += span.rss_delta // 1024
+        return sorted(rows.values(), key=lambda row: row["wall_ms"], reverse=True)
+
+    def format_summary(self):
+        header = (
+            f"{'Span':<32} {'Category':<10} {'Calls':>5} {'Wall ms':>10} "
+            f"{'Max ms':>10} {'CPU ms':>10} {'Procs':>5} {'RSS KB':>8}"
+        )
+        lines = [header, "-" * len(header)]
+        for row in self.summary():
+            lines.append(
+                f"{row['name'][:32]:<32} {row['category'][:10]:<10} "
+                f"{row['calls']:>5} {row['wall_ms']:>10.2f} {row['max_ms']:>10.2f} "
+                f"{row['cpu_ms']:>10.2f} {row['subprocesses']:>5} "
+                f"{row['rss_delta_kb']:>8}"
+            )
+        return "\n".join(lines)
+
+
+profiler = Profiler()
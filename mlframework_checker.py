@@ -1,11 +1,21 @@
+import time
+
+# Captured before the heavy imports so --profile can report startup cost
+_startup_ns = time.perf_counter_ns()
+
 import sys
 import os
+import importlib
 import logging
 import webbrowser
 import subprocess
 import psutil
 import socket
+import sqlite3
+import statistics
 import argparse
+import json
+import threading
 from datetime import datetime
 from PySide6.QtWidgets import (
     QApplication,
@@ -26,9 +36,36 @@ from PySide6.QtWidgets import (
     QProgressBar,
     QStatusBar,
     QCheckBox,
+    QTableWidget,
+    QTableWidgetItem,
+    QHeaderView,
+)
+from PySide6.QtCore import Qt, QTimer, QProcess, QProcessEnvironment, QObject, Signal
+from PySide6.QtGui import QPalette, QColor, QFont, QIcon, QTextCursor
+from instrumentation import profiler
+from history import (
+    DEFAULT_HISTORY_PATH,
+    DEFAULT_STORAGE_DIR,
+    HistoryStore,
+    collect_configuration,
+    run_performance_probes,
 )
-from PySide6.QtCore import Qt, QTimer
-from PySide6.QtGui import QPalette, QColor, QFont, QIcon
+from rules import RuleConfigError, gpu_metric_columns, load_rules
+from processes import SORT_KEYS, ProcessTracker, format_process_table
+from probes import (
+    ProbeError,
+    default_registry,
+    evaluate_compatibility,
+    format_probe_results,
+    pytorch_probe,
+    query_cpu_name,
+    query_cuda_version,
+    run_probes,
+    tensorflow_probe,
+)
+from sampler import Sampler, query_gpu_info, query_gpu_processes, watch
+
+_imports_done_ns = time.perf_counter_ns()
 
 # Initialize logging
 log_file = f"system_check_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
@@ -39,9 +76,72 @@ logging.basicConfig(
 )
 
 
+class ProbeRunner(QObject):
+    """Runs the probe scheduler off the GUI thread."""
+
+    finished = Signal(object)
+
+    def start(self, registry, names=None):
+        threading.Thread(target=self._run, args=(registry, names), daemon=True).start()
+
+    def _run(self, registry, names):
+        self.finished.emit(run_probes(registry, names))
+
+
+class PerformanceProbeRunner(QObject):
+    """Runs the node performance probes off the GUI thread.
+
+    ``finished`` carries the samples, or None when the probes failed.
+    """
+
+    finished = Signal(object)
+
+    def start(self, storage_dir):
+        threading.Thread(target=self._run, args=(storage_dir,), daemon=True).start()
+
+    def _run(self, storage_dir):
+        try:
+            with profiler.span("performance probes"):
+                samples = run_performance_probes(storage_dir=storage_dir)
+        except OSError as e:
+            logging.error(f"Performance probes failed: {e}")
+            samples = None
+        self.finished.emit(samples)
+
+
+# Probes behind the startup checks and the --cli report
+STARTUP_PROBES = ("pytorch", "tensorflow")
+CLI_PROBES = ("pytorch", "tensorflow", "cuda")
+
+
+def build_pip_install_command(packages, wheelhouse=None):
+    """Build a single pip invocation that resolves all packages in one pass.
+
+    When a wheelhouse directory is given, pip is restricted to it so that
+    air-gapped nodes never try to reach the network.
+    """
+    if isinstance(packages, str):
+        packages = [packages]
+    command = [sys.executable, "-m", "pip", "install", "--progress-bar", "off"]
+    if wheelhouse:
+        command += ["--no-index", "--find-links", wheelhouse]
+    return command + list(packages)
+
+
 class MLFrameworkChecker(QMainWindow):
-    def __init__(self):
+    def __init__(
+        self,
+        wheelhouse=None,
+        interactive=True,
+        history_path=None,
+        rules_path=None,
+        check_on_startup=True,
+        storage_dir=DEFAULT_STORAGE_DIR,
+    ):
         super().__init__()
+        self.interactive = interactive
+        self.history_path = history_path
+        self.storage_dir = storage_dir
         self.setWindowTitle("ML Framework and CUDA Checker")
         self.setGeometry(100, 100, 1200, 800)
 
@@ -68,16 +168,39 @@ class MLFrameworkChecker(QMainWindow):
 
         self.torch_installed = False
         self.tensorflow_installed = False
-        self.torch = None
-        self.tf = None
+
+        # Package installation state
+        self.wheelhouse = wheelhouse
+        self.install_process = None
+        self.install_description = None
+        self.install_callback = None
+        self.install_cancelled = False
+
+        # Sampler and alerting state
+        self.cpu_name = None
+        self.latest_gpu_info = []
+        self.gpu_info_checked = False
+        self.cuda_version = None
+        self.cuda_checked = False
+        self.latest_gpu_processes = None
+        self.process_tracker = ProcessTracker()
+        self.rule_engine = None
+        self.alert_notifier = None
+        if rules_path:
+            self.load_alert_rules(rules_path)
 
         # Initialize theme
         self.current_theme = "Light"
         self.set_theme(self.current_theme)
 
-        # Check PyTorch and TensorFlow installation on startup
-        self.check_pytorch()
-        self.check_tensorflow()
+        # Check PyTorch and TensorFlow installation on startup. The imports
+        # run concurrently in fresh interpreters so the window stays live.
+        if check_on_startup:
+            self.pytorch_label.setText("Checking PyTorch...")
+            self.tensorflow_label.setText("Checking TensorFlow...")
+            self.startup_probe_runner = ProbeRunner()
+            self.startup_probe_runner.finished.connect(self.apply_probe_results)
+            self.startup_probe_runner.start(default_registry(), STARTUP_PROBES)
 
         # Start a timer to periodically update system information
         self.update_timer = QTimer(self)
@@ -142,6 +265,37 @@ class MLFrameworkChecker(QMainWindow):
             0,
         )
 
+        self.install_output = QTextEdit()
+        self.install_output.setReadOnly(True)
+        self.install_output.setVisible(False)
+        self.content_layout.addWidget(self.install_output, 11, 0, 1, 2)
+
+        self.alerts_label = QTextEdit()
+        self.alerts_label.setReadOnly(True)
+        self.alerts_label.setVisible(False)
+        self.content_layout.addWidget(self.alerts_label, 12, 0, 1, 2)
+
+        self.process_group = QGroupBox("Processes")
+        process_layout = QVBoxLayout()
+        self.process_sort_selector = QComboBox()
+        self.process_sort_selector.addItems(SORT_KEYS)
+        self.process_sort_selector.currentTextChanged.connect(
+            lambda _: self.update_process_view()
+        )
+        process_layout.addWidget(self.process_sort_selector)
+        self.process_table = QTableWidget(0, 7)
+        self.process_table.setHorizontalHeaderLabels(
+            ["PID", "CPU %", "RSS MB", "Threads", "GPU MB", "GPUs", "Command"]
+        )
+        self.process_table.horizontalHeader().setSectionResizeMode(
+            6, QHeaderView.Stretch
+        )
+        self.process_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        process_layout.addWidget(self.process_table)
+        self.process_group.setLayout(process_layout)
+        self.process_group.setVisible(False)
+        self.content_layout.addWidget(self.process_group, 13, 0, 1, 2)
+
     def init_advanced_features(self):
         self.advanced_group = QGroupBox("Advanced Features")
         self.advanced_checkbox = QCheckBox("Enable Advanced Features")
@@ -159,9 +313,25 @@ class MLFrameworkChecker(QMainWindow):
         self.gpu_logging_button = self.add_button_to_layout(
             "Start GPU Logging", self.start_gpu_logging, advanced_layout
         )
+        self.wheelhouse_button = self.add_button_to_layout(
+            "Install from Wheelhouse", self.install_from_wheelhouse, advanced_layout
+        )
+        self.performance_probes_button = self.add_button_to_layout(
+            "Run Performance Probes", self.check_performance, advanced_layout
+        )
+        self.process_view_button = self.add_button_to_layout(
+            "Show Process View", self.toggle_process_view, advanced_layout
+        )
+        self.environment_probes_button = self.add_button_to_layout(
+            "Run Environment Probes", self.run_environment_probes, advanced_layout
+        )
 
         self.persistence_mode_button.setVisible(False)
         self.gpu_logging_button.setVisible(False)
+        self.wheelhouse_button.setVisible(False)
+        self.performance_probes_button.setVisible(False)
+        self.process_view_button.setVisible(False)
+        self.environment_probes_button.setVisible(False)
 
         self.advanced_group.setLayout(advanced_layout)
         self.content_layout.addWidget(self.advanced_group, 10, 0, 1, 2)
@@ -184,6 +354,10 @@ class MLFrameworkChecker(QMainWindow):
 
         self.persistence_mode_button.setVisible(checked)
         self.gpu_logging_button.setVisible(checked)
+        self.wheelhouse_button.setVisible(checked)
+        self.performance_probes_button.setVisible(checked)
+        self.process_view_button.setVisible(checked)
+        self.environment_probes_button.setVisible(checked)
 
     def add_button_to_layout(self, text, function, layout):
         button = QPushButton(text)
@@ -255,11 +429,16 @@ class MLFrameworkChecker(QMainWindow):
             """
             )
 
+    @profiler.traced("sampler tick", category="sampler")
     def update_system_info(self):
         self.check_system_specs()
+        self.evaluate_alerts()
+        if self.process_group.isVisible():
+            self.update_process_view()
 
     def open_webpage(self, url):
-        webbrowser.open(url, new=2)
+        if self.interactive:
+            webbrowser.open(url, new=2)
 
     def export_logs(self):
         file_path, _ = QFileDialog.getSaveFileName(
@@ -301,109 +480,259 @@ class MLFrameworkChecker(QMainWindow):
             "Don't hesitate to seek help from the community forums if you encounter any difficulties.",
         )
 
-    def install_package(self, package_name):
-        self.status_bar.showMessage(f"Installing {package_name}...")
-        progress = QProgressBar()
-        progress.setRange(0, 0)
-        self.status_bar.addPermanentWidget(progress)
+    def install_package(self, package_names, on_finished=None):
+        """Start an asynchronous pip install of one or more packages.
 
-        try:
-            subprocess.check_call(
-                [sys.executable, "-m", "pip", "install", package_name]
-            )
-            logging.info(f"{package_name} installed successfully.")
-            self.status_bar.showMessage(f"{package_name} installed successfully.", 5000)
-            return True
-        except Exception as e:
-            logging.error(f"Failed to install {package_name}: {e}")
+        pip output is streamed into the install panel while it runs and
+        ``on_finished`` is called with a success flag once pip exits.
+        Returns False if the install could not be started.
+        """
+        if isinstance(package_names, str):
+            package_names = [package_names]
+        description = ", ".join(package_names)
+        if self.install_process is not None:
             self.status_bar.showMessage(
-                f"Failed to install {package_name}. Check logs for details.", 5000
+                "Another installation is already in progress.", 5000
             )
             return False
-        finally:
-            self.status_bar.removeWidget(progress)
 
-    def check_pytorch(self):
-        self.status_bar.showMessage("Checking PyTorch...")
-        try:
-            import torch
+        command = build_pip_install_command(package_names, self.wheelhouse)
+        self.install_description = description
+        self.install_callback = on_finished
+        self.install_cancelled = False
+
+        self.status_bar.showMessage(f"Installing {description}...")
+        self.install_progress = QProgressBar()
+        self.install_progress.setRange(0, 0)
+        self.install_cancel_button = QPushButton("Cancel")
+        self.install_cancel_button.clicked.connect(self.cancel_install)
+        self.status_bar.addPermanentWidget(self.install_progress)
+        self.status_bar.addPermanentWidget(self.install_cancel_button)
+
+        self.install_output.setPlainText("$ " + " ".join(command) + "\n")
+        self.install_output.setVisible(True)
+
+        environment = QProcessEnvironment.systemEnvironment()
+        environment.insert("PYTHONUNBUFFERED", "1")
+        self.install_process = QProcess(self)
+        self.install_process.setProcessChannelMode(QProcess.MergedChannels)
+        self.install_process.setProcessEnvironment(environment)
+        self.install_process.readyReadStandardOutput.connect(self.on_install_output)
+        self.install_process.finished.connect(self.on_install_finished)
+        self.install_process.errorOccurred.connect(self.on_install_error)
+        self.install_process.start(command[0], command[1:])
+        logging.info(f"Installing {description}: {' '.join(command)}")
+        return True
 
+    def on_install_output(self):
+        data = self.install_process.readAllStandardOutput().data()
+        text = data.decode("utf-8", errors="replace")
+        self.install_output.moveCursor(QTextCursor.End)
+        self.install_output.insertPlainText(text)
+        self.install_output.ensureCursorVisible()
+        for line in text.splitlines():
+            if line.strip():
+                logging.info(f"pip: {line}")
+
+    def on_install_error(self, error):
+        # Crashes and kills are reported through finished(); only a process
+        # that never started needs to be handled here.
+        if error == QProcess.FailedToStart:
+            logging.error(
+                f"Failed to start pip for {self.install_description}: "
+                f"{self.install_process.errorString()}"
+            )
+            self.finish_install(False)
+
+    def on_install_finished(self, exit_code, exit_status):
+        success = exit_status == QProcess.NormalExit and exit_code == 0
+        self.finish_install(success)
+
+    def cancel_install(self):
+        if self.install_process is not None:
+            self.install_cancelled = True
+            self.status_bar.showMessage(
+                f"Cancelling installation of {self.install_description}..."
+            )
+            self.install_process.kill()
+
+    def finish_install(self, success):
+        if self.install_process is None:
+            return
+        description = self.install_description
+        callback = self.install_callback
+
+        self.status_bar.removeWidget(self.install_progress)
+        self.status_bar.removeWidget(self.install_cancel_button)
+        self.install_progress.deleteLater()
+        self.install_cancel_button.deleteLater()
+        self.install_process.deleteLater()
+        self.install_process = None
+        self.install_callback = None
+
+        if success:
+            # Make freshly installed packages importable in this process
+            importlib.invalidate_caches()
+            logging.info(f"{description} installed successfully.")
+            self.status_bar.showMessage(f"{description} installed successfully.", 5000)
+        elif self.install_cancelled:
+            logging.warning(f"Installation of {description} was cancelled.")
+            self.status_bar.showMessage(
+                f"Installation of {description} cancelled.", 5000
+            )
+        else:
+            logging.error(f"Failed to install {description}.")
+            self.status_bar.showMessage(
+                f"Failed to install {description}. Check logs for details.", 5000
+            )
+
+        if callback is not None:
+            callback(success)
+
+    def install_from_wheelhouse(self):
+        wheelhouse = QFileDialog.getExistingDirectory(
+            self, "Select Wheelhouse Directory", self.wheelhouse or ""
+        )
+        if not wheelhouse:
+            return
+        self.wheelhouse = wheelhouse
+
+        callbacks = {}
+        if not self.torch_installed:
+            callbacks["torch"] = self.on_pytorch_installed
+        if not self.tensorflow_installed:
+            callbacks["tensorflow"] = self.on_tensorflow_installed
+        if not callbacks:
+            self.status_bar.showMessage(
+                "PyTorch and TensorFlow are already installed.", 5000
+            )
+            return
+
+        def on_finished(success):
+            for callback in callbacks.values():
+                callback(success)
+
+        self.install_package(list(callbacks), on_finished=on_finished)
+
+    def apply_probe_results(self, results):
+        """Show the results of a ``run_probes`` call in the check labels."""
+        values = {
+            name: result.value if result.status == "ok" else {"error": result.error}
+            for name, result in results.items()
+        }
+        if "pytorch" in values:
+            self.check_pytorch(values["pytorch"])
+        if "tensorflow" in values:
+            self.check_tensorflow(values["tensorflow"])
+        if "cuda" in values:
+            self.check_cuda(values["cuda"])
+            self.check_system_compatibility(values["cuda"])
+
+    @profiler.traced()
+    def check_pytorch(self, result=None):
+        """Show the PyTorch status; ``result`` is a ``pytorch`` probe value."""
+        self.status_bar.showMessage("Checking PyTorch...")
+        if result is None:
+            result = pytorch_probe({})
+        if result.get("installed"):
             self.torch_installed = True
-            self.torch = torch
             self.pytorch_label.setText(
-                f"PyTorch is available. Version: {torch.__version__}"
+                f"PyTorch is available. Version: {result['version']}"
             )
             self.status_bar.showMessage("PyTorch check completed.", 3000)
-        except ImportError:
+        elif result.get("error"):
+            self.pytorch_label.setText(f"PyTorch check failed: {result['error']}")
+            logging.error(f"PyTorch check failed: {result['error']}")
+        else:
             self.pytorch_label.setText("PyTorch is not installed.")
             if (
-                QMessageBox.question(
+                self.interactive
+                and QMessageBox.question(
                     self,
                     "Install PyTorch",
                     "PyTorch is not installed. Would you like to install it now?",
                 )
                 == QMessageBox.Yes
             ):
-                if self.install_package("torch"):
-                    import torch
-
-                    self.torch_installed = True
-                    self.torch = torch
-                    self.pytorch_label.setText(
-                        f"PyTorch has been installed. Version: {torch.__version__}"
-                    )
-                else:
-                    self.pytorch_label.setText(
-                        "Failed to install PyTorch. Please install it manually."
-                    )
+                if self.install_package("torch", on_finished=self.on_pytorch_installed):
+                    self.pytorch_label.setText("Installing PyTorch...")
             self.open_webpage("https://pytorch.org/")
 
-    def check_tensorflow(self):
-        self.status_bar.showMessage("Checking TensorFlow...")
+    def on_pytorch_installed(self, success):
         try:
-            import tensorflow as tf
+            if not success:
+                raise ImportError("pip install failed")
+            import torch
 
+            self.torch_installed = True
+            self.pytorch_label.setText(
+                f"PyTorch has been installed. Version: {torch.__version__}"
+            )
+        except ImportError:
+            self.pytorch_label.setText(
+                "Failed to install PyTorch. Please install it manually."
+            )
+
+    @profiler.traced()
+    def check_tensorflow(self, result=None):
+        """Show the TensorFlow status; ``result`` is a ``tensorflow`` probe value."""
+        self.status_bar.showMessage("Checking TensorFlow...")
+        if result is None:
+            result = tensorflow_probe({})
+        if result.get("installed"):
             self.tensorflow_installed = True
-            self.tf = tf
             self.tensorflow_label.setText(
-                f"TensorFlow is available. Version: {tf.__version__}"
+                f"TensorFlow is available. Version: {result['version']}"
             )
             self.status_bar.showMessage("TensorFlow check completed.", 3000)
-        except ImportError:
+        elif result.get("error"):
+            self.tensorflow_label.setText(f"TensorFlow check failed: {result['error']}")
+            logging.error(f"TensorFlow check failed: {result['error']}")
+        else:
             self.tensorflow_label.setText("TensorFlow is not installed.")
             if (
-                QMessageBox.question(
+                self.interactive
+                and QMessageBox.question(
                     self,
                     "Install TensorFlow",
                     "TensorFlow is not installed. Would you like to install it now?",
                 )
                 == QMessageBox.Yes
             ):
-                if self.install_package("tensorflow"):
-                    import tensorflow as tf
-
-                    self.tensorflow_installed = True
-                    self.tf = tf
-                    self.tensorflow_label.setText(
-                        f"TensorFlow has been installed. Version: {tf.__version__}"
-                    )
-                else:
-                    self.tensorflow_label.setText(
-                        "Failed to install TensorFlow. Please install it manually."
-                    )
+                if self.install_package(
+                    "tensorflow", on_finished=self.on_tensorflow_installed
+                ):
+                    self.tensorflow_label.setText("Installing TensorFlow...")
             self.open_webpage("https://www.tensorflow.org/install")
 
-    def get_cuda_version(self):
+    def on_tensorflow_installed(self, success):
         try:
-            output = subprocess.check_output(["nvcc", "--version"]).decode("utf-8")
-            cuda_version = output.split("release ")[-1].split(",")[0]
-            return cuda_version
-        except:
-            return None
+            if not success:
+                raise ImportError("pip install failed")
+            import tensorflow as tf
+
+            self.tensorflow_installed = True
+            self.tensorflow_label.setText(
+                f"TensorFlow has been installed. Version: {tf.__version__}"
+            )
+        except ImportError:
+            self.tensorflow_label.setText(
+                "Failed to install TensorFlow. Please install it manually."
+            )
+
+    @profiler.traced()
+    def get_cuda_version(self):
+        return query_cuda_version()
 
-    def check_cuda(self):
+    @profiler.traced()
+    def check_cuda(self, result=None):
+        """Show the CUDA status; ``result`` is a ``cuda`` probe value."""
         self.status_bar.showMessage("Checking CUDA...")
-        cuda_version = self.get_cuda_version()
+        if result is None:
+            result = {"version": self.get_cuda_version()}
+        cuda_version = result.get("version")
+        self.cuda_version = cuda_version
+        self.cuda_checked = True
         if cuda_version:
             self.cuda_label.setText(f"CUDA is available. Version: {cuda_version}")
             logging.info(f"CUDA is available. Version: {cuda_version}")
@@ -417,65 +746,49 @@ class MLFrameworkChecker(QMainWindow):
             self.open_webpage("https://developer.nvidia.com/cuda-downloads")
         self.status_bar.showMessage("CUDA check completed.", 3000)
 
+    @profiler.traced()
     def get_gpu_info(self):
         try:
-            nvidia_smi_output = (
-                subprocess.check_output(
-                    [
-                        "nvidia-smi",
-                        "--query-gpu=index,name,pci.bus_id,driver_version,vbios_version,memory.total,memory.free,memory.used,utilization.gpu,utilization.memory,temperature.gpu,power.draw,power.limit,clocks.current.sm,clocks.current.memory,pstate,pcie.link.gen.current,pcie.link.gen.max",
-                        "--format=csv,noheader,nounits",
-                    ]
-                )
-                .decode("utf-8")
-                .strip()
-                .split("\n")
-            )
-
-            gpu_info = []
-            for line in nvidia_smi_output:
-                values = line.split(", ")
-                gpu_info.append(
-                    {
-                        "index": values[0],
-                        "name": values[1],
-                        "pci_bus_id": values[2],
-                        "driver_version": values[3],
-                        "vbios_version": values[4],
-                        "memory_total": values[5],
-                        "memory_free": values[6],
-                        "memory_used": values[7],
-                        "gpu_utilization": values[8],
-                        "memory_utilization": values[9],
-                        "temperature": values[10],
-                        "power_draw": values[11],
-                        "power_limit": values[12],
-                        "sm_clock": values[13],
-                        "memory_clock": values[14],
-                        "pstate": values[15],
-                        "pcie_link_gen_current": values[16],
-                        "pcie_link_gen_max": values[17],
-                    }
-                )
-            return gpu_info
+            return query_gpu_info()
         except Exception as e:
             logging.error(f"Error getting GPU info: {e}")
             return []
 
+    def get_cpu_name(self):
+        return query_cpu_name()
+
+    @profiler.traced()
+    def get_gpu_processes(self):
+        try:
+            return query_gpu_processes()
+        except Exception as e:
+            logging.error(f"Error getting GPU processes: {e}")
+            return []
+
+    def current_gpu_processes(self):
+        # Shared by the alert rules and the process view within one tick
+        if self.latest_gpu_processes is None:
+            self.latest_gpu_processes = self.get_gpu_processes()
+        return self.latest_gpu_processes
+
+    @profiler.traced()
     def check_system_specs(self):
         self.status_bar.showMessage("Checking system specifications...")
         try:
             cpu_info = psutil.cpu_freq().max
-            cpu_name = (
-                subprocess.check_output("wmic cpu get name", shell=True)
-                .decode()
-                .strip()
-                .split("\n")[1]
-            )
+            if self.cpu_name is None:
+                # The CPU model never changes, so only look it up once
+                with profiler.span("wmic cpu name"):
+                    self.cpu_name = self.get_cpu_name()
+            cpu_name = self.cpu_name
             ram_info = "{:.2f}".format(psutil.virtual_memory().total / (1024**3))
             gpus = self.get_gpu_info()
-            hostname = socket.gethostname()
-            ip_address = socket.gethostbyname(hostname)
+            self.latest_gpu_info = gpus
+            self.gpu_info_checked = True
+            self.latest_gpu_processes = None
+            with profiler.span("dns lookup"):
+                hostname = socket.gethostname()
+                ip_address = socket.gethostbyname(hostname)
 
             system_info = f"CPU: {cpu_name}, Speed: {cpu_info} MHz\nRAM: {ram_info} GB\nHostname: {hostname}\nIP Address: {ip_address}\n\nGPU Information:\n"
             for gpu in gpus:
@@ -496,7 +809,8 @@ class MLFrameworkChecker(QMainWindow):
                     f"  PCIe Link Gen (Current/Max): {gpu['pcie_link_gen_current']} / {gpu['pcie_link_gen_max']}\n\n"
                 )
 
-            self.system_label.setText(system_info)
+            with profiler.span("render system specs", category="gui"):
+                self.system_label.setText(system_info)
             logging.info(f"System specs: {system_info}")
             self.status_bar.showMessage("System specifications check completed.", 3000)
         except Exception as e:
@@ -508,6 +822,78 @@ class MLFrameworkChecker(QMainWindow):
                 "Error checking system specifications. Check logs for details.", 5000
             )
 
+    def load_alert_rules(self, path):
+        try:
+            self.rule_engine, self.alert_notifier = load_rules(path)
+            self.alerts_label.setVisible(True)
+            self.alerts_label.setPlainText(
+                f"Loaded {len(self.rule_engine.rules)} alert rules from {path}"
+            )
+            logging.info(
+                f"Loaded {len(self.rule_engine.rules)} alert rules from {path}"
+            )
+        except (RuleConfigError, OSError, ValueError) as e:
+            self.rule_engine = self.alert_notifier = None
+            logging.error(f"Failed to load alert rules from {path}: {e}")
+            self.status_bar.showMessage(
+                "Failed to load alert rules. Check logs for details.", 5000
+            )
+
+    @profiler.traced(category="sampler")
+    def evaluate_alerts(self):
+        if self.rule_engine is None:
+            return []
+        processes = None
+        if "compute_processes" in self.rule_engine.required_metrics:
+            processes = self.current_gpu_processes()
+        sample = gpu_metric_columns(self.latest_gpu_info, processes)
+        sample["ram_used_pct"] = psutil.virtual_memory().percent
+        sample["cpu_percent"] = psutil.cpu_percent(interval=None)
+
+        alerts = self.rule_engine.evaluate(sample)
+        self.alert_notifier.notify(alerts)
+        for alert in alerts:
+            self.alerts_label.append(
+                f"{datetime.fromtimestamp(alert.timestamp).strftime('%H:%M:%S')} {alert}"
+            )
+            if alert.state == "firing":
+                self.status_bar.showMessage(str(alert), 10000)
+        return alerts
+
+    def toggle_process_view(self):
+        visible = not self.process_group.isVisible()
+        self.process_group.setVisible(visible)
+        self.process_view_button.setText(
+            "Hide Process View" if visible else "Show Process View"
+        )
+        if visible:
+            self.update_process_view()
+
+    def process_rows(self, top_n=15, sort_by="cpu_percent"):
+        return self.process_tracker.sample(
+            self.current_gpu_processes(),
+            self.latest_gpu_info,
+            top_n=top_n,
+            sort_by=sort_by,
+        )
+
+    @profiler.traced(category="sampler")
+    def update_process_view(self):
+        rows = self.process_rows(sort_by=self.process_sort_selector.currentText())
+        self.process_table.setRowCount(len(rows))
+        for row_number, row in enumerate(rows):
+            values = [
+                str(row["pid"]),
+                f"{row['cpu_percent']:.1f}",
+                f"{row['rss_mb']:.1f}",
+                str(row["threads"]),
+                f"{row['gpu_memory_mb']:.0f}",
+                ",".join(row["gpus"]),
+                row["cmdline"],
+            ]
+            for column, value in enumerate(values):
+                self.process_table.setItem(row_number, column, QTableWidgetItem(value))
+
     def enable_persistence_mode(self):
         self.status_bar.showMessage("Enabling NVIDIA persistence mode...")
         try:
@@ -552,27 +938,20 @@ class MLFrameworkChecker(QMainWindow):
                 "Failed to start GPU logging. Check logs for details.", 5000
             )
 
-    def check_system_compatibility(self):
+    @profiler.traced()
+    def check_system_compatibility(self, cuda=None):
+        """Check the minimum requirements; ``cuda`` is a ``cuda`` probe value."""
         self.status_bar.showMessage("Checking system compatibility...")
         self.compatibility_label.setText("Checking System Compatibility...")
-        compatible = True
-        messages = []
-
-        if psutil.cpu_count() < 4:
-            messages.append(
-                "Your system has less than 4 CPU cores, which may affect performance."
-            )
-            compatible = False
-        if psutil.virtual_memory().total < 8 * (1024**3):
-            messages.append(
-                "Your system has less than 8 GB of RAM, which may affect performance."
-            )
-            compatible = False
-        if not self.get_cuda_version():
-            messages.append(
-                "CUDA is not detected, which may limit GPU acceleration capabilities."
-            )
-            compatible = False
+        if cuda is None:
+            cuda = {"version": self.get_cuda_version()}
+        self.cuda_version = cuda.get("version")
+        self.cuda_checked = True
+        cpu_count = psutil.cpu_count()
+        ram_total = psutil.virtual_memory().total
+        compatible, messages = evaluate_compatibility(
+            cpu_count, ram_total, cuda.get("version")
+        )
 
         if compatible:
             self.compatibility_label.setText("Your system is compatible.")
@@ -580,29 +959,306 @@ class MLFrameworkChecker(QMainWindow):
         else:
             self.compatibility_label.setText("\n".join(messages))
             logging.warning(f"System compatibility issues: {', '.join(messages)}")
+        self.record_history(
+            "compatibility",
+            [
+                ("system", "cpu_cores", cpu_count, "cores"),
+                ("system", "ram_gb", ram_total / (1024**3), "GB"),
+                ("system", "compatible", 1 if compatible else 0, None),
+            ],
+        )
         self.status_bar.showMessage("System compatibility check completed.", 3000)
 
+    def check_performance(self):
+        self.status_bar.showMessage("Running performance probes...")
+        self.performance_probes_button.setEnabled(False)
+        self.performance_runner = PerformanceProbeRunner()
+        self.performance_runner.finished.connect(self.on_performance_finished)
+        self.performance_runner.start(self.storage_dir)
+
+    def on_performance_finished(self, samples):
+        self.performance_probes_button.setEnabled(True)
+        if samples is None:
+            self.status_bar.showMessage(
+                "Performance probes failed. Check logs for details.", 5000
+            )
+            return
+        summary = self.report_performance(samples)
+        if self.interactive:
+            QMessageBox.information(self, "Performance Probes", summary)
+
+    def report_performance(self, samples):
+        """Record performance probe samples and return a summary of medians."""
+        self.record_history("performance", samples, {"storage_dir": self.storage_dir})
+
+        medians = {}
+        for component, metric, value, unit in samples:
+            medians.setdefault((component, metric, unit), []).append(value)
+        summary = "\n".join(
+            f"{component}.{metric}: {statistics.median(values):.2f} {unit}"
+            for (component, metric, unit), values in medians.items()
+        )
+        logging.info(f"Performance probes: {summary}")
+        self.status_bar.showMessage("Performance probes completed.", 3000)
+        return summary
+
+    def run_environment_probes(self):
+        self.status_bar.showMessage("Running environment probes...")
+        self.environment_probes_button.setEnabled(False)
+        self.probe_runner = ProbeRunner()
+        self.probe_runner.finished.connect(self.on_environment_probes_finished)
+        self.probe_runner.start(default_registry())
 
-def main():
+    def on_environment_probes_finished(self, results):
+        self.environment_probes_button.setEnabled(True)
+        summary = format_probe_results(results)
+        logging.info(f"Environment probes:\n{summary}")
+        self.status_bar.showMessage("Environment probes completed.", 3000)
+        if self.interactive:
+            QMessageBox.information(self, "Environment Probes", summary)
+
+    def history_configuration(self, extra=None):
+        # Reuse what the checks already read instead of running nvcc and
+        # nvidia-smi again for every recorded run
+        if not self.cuda_checked:
+            self.cuda_version = self.get_cuda_version()
+            self.cuda_checked = True
+        if not self.gpu_info_checked:
+            self.latest_gpu_info = self.get_gpu_info()
+            self.gpu_info_checked = True
+        gpus = self.latest_gpu_info
+        return collect_configuration(
+            {
+                "cuda": self.cuda_version,
+                "nvidia_driver": gpus[0]["driver_version"] if gpus else None,
+                "gpus": [gpu["name"] for gpu in gpus],
+                **(extra or {}),
+            }
+        )
+
+    def record_history(self, kind, samples, extra=None):
+        if not self.history_path:
+            return
+        try:
+            with HistoryStore(self.history_path) as store:
+                store.record_run(kind, samples, self.history_configuration(extra))
+        except (sqlite3.Error, OSError) as e:
+            logging.error(f"Failed to record {kind} results in history: {e}")
+
+
+def report_profile(args):
+    if args.trace:
+        profiler.export_chrome_trace(args.trace)
+        print(f"Trace written to {args.trace}")
+    if args.profile:
+        print(profiler.format_summary())
+
+
+def main(
+    wheelhouse=None, history_path=None, rules_path=None, storage_dir=DEFAULT_STORAGE_DIR
+):
     app = QApplication(sys.argv)
-    window = MLFrameworkChecker()
-    window.show()
-    sys.exit(app.exec())
+    with profiler.span("window startup", category="startup"):
+        window = MLFrameworkChecker(
+            wheelhouse=wheelhouse,
+            history_path=history_path,
+            rules_path=rules_path,
+            storage_dir=storage_dir,
+        )
+        window.show()
+    return app.exec()
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="ML Framework and CUDA Check")
     parser.add_argument("--cli", action="store_true", help="Run in CLI mode")
+    parser.add_argument(
+        "--install",
+        nargs="+",
+        metavar="PACKAGE",
+        help="Install the given packages in a single pip run and exit",
+    )
+    parser.add_argument(
+        "--wheelhouse",
+        metavar="DIR",
+        help="Install packages only from this local wheel directory (no network)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Time each probe and print a summary table on exit",
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="FILE",
+        help="Write probe timings to FILE as a Chrome trace (enables profiling)",
+    )
+    parser.add_argument(
+        "--history-db",
+        metavar="FILE",
+        default=DEFAULT_HISTORY_PATH,
+        help=f"SQLite file that check results are appended to (default: {DEFAULT_HISTORY_PATH})",
+    )
+    parser.add_argument(
+        "--no-history", action="store_true", help="Do not record check results"
+    )
+    parser.add_argument(
+        "--perf-probes",
+        action="store_true",
+        help="In CLI mode, also run the CPU, memory and storage performance probes",
+    )
+    parser.add_argument(
+        "--storage-dir",
+        default=DEFAULT_STORAGE_DIR,
+        metavar="DIR",
+        help=f"Directory the storage probe writes to (default: {DEFAULT_STORAGE_DIR})",
+    )
+    parser.add_argument(
+        "--rules",
+        metavar="FILE",
+        help="Evaluate the alert rules in FILE (TOML or YAML) on every refresh",
+    )
+    parser.add_argument(
+        "--processes",
+        nargs="?",
+        const=10,
+        type=int,
+        metavar="N",
+        help="In CLI mode, show the top N processes by CPU or GPU usage",
+    )
+    parser.add_argument(
+        "--sort-by",
+        choices=SORT_KEYS,
+        default="cpu_percent",
+        help="Sort key for --processes (default: cpu_percent)",
+    )
+    parser.add_argument(
+        "--probes",
+        nargs="*",
+        metavar="NAME",
+        help="Run the named environment probes (default: all) concurrently and exit",
+    )
+    parser.add_argument(
+        "--probe-workers",
+        type=int,
+        metavar="N",
+        help="Number of probes run at the same time (default: up to 8)",
+    )
+    parser.add_argument(
+        "--watch",
+        type=float,
+        metavar="SECONDS",
+        help="In CLI mode, sample every SECONDS and stream snapshots until interrupted",
+    )
+    parser.add_argument(
+        "--output",
+        choices=["table", "json"],
+        default="table",
+        help="Watch and probe output: table or (newline-delimited) JSON",
+    )
+    parser.add_argument(
+        "--batch",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Write JSON watch output N snapshots at a time (default: 1)",
+    )
+    parser.add_argument(
+        "--count",
+        type=int,
+        metavar="N",
+        help="Stop watching after N snapshots",
+    )
     args = parser.parse_args()
+    history_path = None if args.no_history else args.history_db
 
-    if args.cli:
+    if args.profile or args.trace:
+        profiler.enable()
+        profiler.add_span("startup imports", _startup_ns, _imports_done_ns, "startup")
+
+    if args.watch and args.watch <= 0:
+        parser.error("--watch needs a positive interval")
+
+    if args.install:
+        sys.exit(
+            subprocess.call(build_pip_install_command(args.install, args.wheelhouse))
+        )
+    elif args.probes is not None:
+        registry = default_registry()
+        try:
+            results = run_probes(registry, args.probes, max_workers=args.probe_workers)
+        except ProbeError as e:
+            parser.error(str(e))
+        if args.output == "json":
+            print(json.dumps([result.to_dict() for result in results.values()]))
+        else:
+            print(format_probe_results(results))
+        report_profile(args)
+        sys.exit(0 if all(result.status == "ok" for result in results.values()) else 1)
+    elif args.watch:
+        rule_engine = alert_notifier = None
+        if args.rules:
+            try:
+                rule_engine, alert_notifier = load_rules(args.rules)
+            except (RuleConfigError, OSError, ValueError) as e:
+                parser.error(f"cannot load alert rules from {args.rules}: {e}")
+        sampler = Sampler(
+            args.watch,
+            rule_engine=rule_engine,
+            alert_notifier=alert_notifier,
+            top_n=args.processes or 0,
+        )
+        status = watch(
+            sampler, args.watch, output=args.output, batch=args.batch, count=args.count
+        )
+        report_profile(args)
+        sys.exit(status)
+    elif args.cli:
         print("Running in CLI mode")
-        checker = MLFrameworkChecker()
-        checker.check_pytorch()
-        checker.check_tensorflow()
-        checker.check_cuda()
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        app = QApplication(sys.argv)
+        with profiler.span("window startup", category="startup"):
+            checker = MLFrameworkChecker(
+                wheelhouse=args.wheelhouse,
+                interactive=False,
+                history_path=history_path,
+                rules_path=args.rules,
+                check_on_startup=False,
+                storage_dir=args.storage_dir,
+            )
+        # The framework imports and nvcc run concurrently
         checker.check_system_specs()
-        checker.check_system_compatibility()
+        checker.apply_probe_results(run_probes(default_registry(), CLI_PROBES))
+        for label in (
+            checker.pytorch_label,
+            checker.tensorflow_label,
+            checker.cuda_label,
+            checker.system_label,
+            checker.compatibility_label,
+        ):
+            print(label.text() if isinstance(label, QLabel) else label.toPlainText())
+        if args.perf_probes:
+            with profiler.span("performance probes"):
+                samples = run_performance_probes(storage_dir=args.storage_dir)
+            print(checker.report_performance(samples))
+        for alert in checker.evaluate_alerts():
+            print(alert)
+        if checker.alert_notifier is not None:
+            checker.alert_notifier.flush()
+        if args.processes:
+            # CPU usage is measured between two samples
+            checker.process_rows(top_n=args.processes, sort_by=args.sort_by)
+            time.sleep(0.5)
+            rows = checker.process_rows(top_n=args.processes, sort_by=args.sort_by)
+            print(format_process_table(rows))
         print(f"Logs exported to {log_file}")
+        report_profile(args)
     else:
-        main()
+        status = main(
+            wheelhouse=args.wheelhouse,
+            history_path=history_path,
+            rules_path=args.rules,
+            storage_dir=args.storage_dir,
+        )
+        report_profile(args)
+        sys.exit(status)
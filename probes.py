@@ -0,0 +1,512 @@
+"""Pluggable environment probes and a concurrent dependency-aware scheduler.
+
+A probe is a function that receives the results of the probes it depends on
+and returns a JSON-serialisable value::
+
+    @probe("compatibility", requires=("cpu", "memory", "cuda"))
+    def compatibility_probe(inputs):
+        ...
+
+Third-party packages can add probes through the ``mlframework_checker.probes``
+entry point group; each entry point must resolve to a ``Probe`` or an
+iterable of them.
+
+``run_probes`` starts every probe as soon as its dependencies have finished,
+on a thread pool. Probes declared with ``executor="process"`` (framework
+imports, which are slow, hold the GIL and can crash the interpreter) run in a
+fresh interpreter that is killed when it exceeds its timeout.
+"""
+
+import ctypes
+import ctypes.util
+import importlib.util
+import json
+import logging
+import platform
+import queue
+import subprocess
+import sys
+import threading
+import time
+from importlib import metadata
+
+import psutil
+
+from instrumentation import profiler
+from sampler import QUERY_TIMEOUT, query_gpu_info
+
+ENTRY_POINT_GROUP = "mlframework_checker.probes"
+RESULT_MARKER = "__probe_result__:"
+
+PROCESS_PROBE_SCRIPT = """
+import importlib
+import json
+import sys
+
+request = json.loads(sys.stdin.read())
+sys.path[:0] = request["path"]
+function = importlib.import_module(request["module"])
+for part in request["qualname"].split("."):
+    function = getattr(function, part)
+result = function(request["inputs"])
+sys.stdout.write("\\n" + {marker!r} + json.dumps(result) + "\\n")
+""".format(marker=RESULT_MARKER)
+
+
+class ProbeError(Exception):
+    pass
+
+
+class Probe:
+    def __init__(
+        self,
+        name,
+        function,
+        requires=(),
+        timeout=30,
+        executor="thread",
+        description="",
+        module=None,
+    ):
+        if executor not in ("thread", "process"):
+            raise ValueError(f"Unknown executor {executor!r} for probe {name}")
+        self.name = name
+        self.function = function
+        self.requires = tuple(requires)
+        self.timeout = timeout
+        self.executor = executor
+        self.description = description
+        self.module = module
+
+    def run(self, inputs):
+        with profiler.span(self.name, category="probe"):
+            # Spare an interpreter launch when the framework is not installed
+            if self.module and importlib.util.find_spec(self.module) is None:
+                return {"installed": False}
+            if self.executor == "process":
+                return _run_in_process(self, inputs)
+            return self.function(inputs)
+
+
+class ProbeResult:
+    def __init__(self, name, status, value=None, error=None, duration=0.0):
+        self.name = name
+        self.status = status
+        self.value = value
+        self.error = error
+        self.duration = duration
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "status": self.status,
+            "value": self.value,
+            "error": self.error,
+            "duration": round(self.duration, 4),
+        }
+
+
+class ProbeRegistry:
+    def __init__(self, probes=()):
+        self.probes = {}
+        for item in probes:
+            self.register(item)
+
+    def register(self, item):
+        if item.name in self.probes:
+            logging.warning(f"Probe {item.name} is registered twice; keeping the last")
+        self.probes[item.name] = item
+
+    def discover(self):
+        """Register probes published by installed packages."""
+        for entry_point in metadata.entry_points(group=ENTRY_POINT_GROUP):
+            try:
+                loaded = entry_point.load()
+                for item in [loaded] if isinstance(loaded, Probe) else loaded:
+                    self.register(item)
+            except Exception as e:
+                logging.error(f"Failed to load probe plugin {entry_point.name}: {e}")
+        return self
+
+    def resolve(self, names=None):
+        """Return the requested probes and their dependencies in run order."""
+        ordered = []
+        state = {}
+
+        def visit(name, chain):
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise ProbeError(
+                    "Probe dependency cycle: " + " -> ".join(chain + [name])
+                )
+            if name not in self.probes:
+                needed_by = f" (required by {chain[-1]})" if chain else ""
+                raise ProbeError(f"Unknown probe {name}{needed_by}")
+            state[name] = "visiting"
+            for requirement in self.probes[name].requires:
+                visit(requirement, chain + [name])
+            state[name] = "done"
+            ordered.append(self.probes[name])
+
+        for name in names or self.probes:
+            visit(name, [])
+        return ordered
+
+
+BUILTIN_PROBES = []
+
+
+def probe(name, requires=(), timeout=30, executor="thread", module=None):
+    """Decorator registering a built-in probe.
+
+    ``module`` names the top-level module a framework probe imports; when it
+    is not installed the probe reports ``{"installed": False}`` without
+    running.
+    """
+
+    def decorator(function):
+        BUILTIN_PROBES.append(
+            Probe(
+                name,
+                function,
+                requires,
+                timeout,
+                executor,
+                (function.__doc__ or "").strip(),
+                module,
+            )
+        )
+        return function
+
+    return decorator
+
+
+def default_registry():
+    return ProbeRegistry(BUILTIN_PROBES).discover()
+
+
+def _run_in_process(item, inputs):
+    request = {
+        "module": item.function.__module__,
+        "qualname": item.function.__qualname__,
+        "inputs": inputs,
+        "path": [entry for entry in sys.path if entry],
+    }
+    try:
+        completed = subprocess.run(
+            [sys.executable, "-c", PROCESS_PROBE_SCRIPT],
+            input=json.dumps(request),
+            capture_output=True,
+            text=True,
+            timeout=item.timeout,
+        )
+    except subprocess.TimeoutExpired:
+        # subprocess.run kills the interpreter before raising
+        raise TimeoutError(f"timed out after {item.timeout}s") from None
+    for line in reversed(completed.stdout.splitlines()):
+        if line.startswith(RESULT_MARKER):
+            return json.loads(line[len(RESULT_MARKER) :])
+    stderr = completed.stderr.strip().splitlines()
+    raise ProbeError(stderr[-1] if stderr else f"exit status {completed.returncode}")
+
+
+def _execute(item, inputs, outcomes):
+    try:
+        outcome = ("ok", item.run(inputs), None)
+    except TimeoutError as e:
+        outcome = ("timeout", None, str(e))
+    except Exception as e:
+        outcome = ("error", None, str(e))
+    outcomes.put((item.name,) + outcome)
+
+
+def run_probes(registry, names=None, max_workers=None):
+    """Run probes concurrently in dependency order.
+
+    Returns a dictionary of ``ProbeResult`` keyed by probe name. Probes whose
+    dependencies failed are skipped rather than run. Probes run on daemon
+    threads: a thread cannot be interrupted, so one that times out is
+    abandoned and cannot keep the interpreter from exiting.
+    """
+    order = registry.resolve(names)
+    max_workers = max_workers or min(8, len(order) or 1)
+    pending = {item.name: item for item in order}
+    results = {}
+    running = {}
+    outcomes = queue.Queue()
+
+    def submit_ready():
+        progress = True
+        while progress:
+            progress = False
+            for name, item in list(pending.items()):
+                if not all(requirement in results for requirement in item.requires):
+                    continue
+                failed = [r for r in item.requires if results[r].status != "ok"]
+                if failed:
+                    del pending[name]
+                    progress = True
+                    results[name] = ProbeResult(
+                        name,
+                        "skipped",
+                        error=f"dependency {failed[0]} {results[failed[0]].status}",
+                    )
+                    continue
+                if len(running) >= max_workers:
+                    continue
+                del pending[name]
+                inputs = {r: results[r].value for r in item.requires}
+                started = time.monotonic()
+                # Process probes enforce their own timeout; the margin
+                # covers interpreter startup.
+                margin = 10 if item.executor == "process" else 0
+                running[name] = (started, started + item.timeout + margin)
+                threading.Thread(
+                    target=_execute, args=(item, inputs, outcomes), daemon=True
+                ).start()
+
+    submit_ready()
+    while running:
+        deadline = min(deadline for _, deadline in running.values())
+        try:
+            name, status, value, error = outcomes.get(
+                timeout=max(0.0, deadline - time.monotonic())
+            )
+        except queue.Empty:
+            pass
+        else:
+            # Results of probes that already timed out are discarded
+            if name in running:
+                started, _ = running.pop(name)
+                results[name] = ProbeResult(
+                    name, status, value, error, duration=time.monotonic() - started
+                )
+        now = time.monotonic()
+        for name, (started, deadline) in list(running.items()):
+            if now >= deadline:
+                running.pop(name)
+                results[name] = ProbeResult(
+                    name,
+                    "timeout",
+                    error=f"timed out after {registry.probes[name].timeout}s",
+                    duration=now - started,
+                )
+        submit_ready()
+    return {item.name: results[item.name] for item in order}
+
+
+def format_probe_results(results):
+    lines = [f"{'Probe':<16} {'Status':<8} {'Time s':>7}  Result"]
+    for result in results.values():
+        detail = result.error if result.status != "ok" else json.dumps(result.value)
+        lines.append(
+            f"{result.name:<16} {result.status:<8} {result.duration:>7.2f}  "
+            f"{detail[:100]}"
+        )
+    return "\n".join(lines)
+
+
+def query_cuda_version():
+    try:
+        output = subprocess.check_output(
+            ["nvcc", "--version"], timeout=QUERY_TIMEOUT
+        ).decode("utf-8")
+        return output.split("release ")[-1].split(",")[0]
+    except Exception:
+        return None
+
+
+def query_cpu_name():
+    try:
+        return (
+            subprocess.check_output(
+                "wmic cpu get name",
+                shell=True,
+                stderr=subprocess.DEVNULL,
+                timeout=QUERY_TIMEOUT,
+            )
+            .decode()
+            .strip()
+            .split("\n")[1]
+        )
+    except (subprocess.SubprocessError, OSError, IndexError):
+        # wmic only exists on Windows
+        try:
+            with open("/proc/cpuinfo") as f:
+                for line in f:
+                    if line.startswith("model name"):
+                        return line.split(":", 1)[1].strip()
+        except OSError:
+            pass
+        return platform.processor() or platform.machine()
+
+
+def evaluate_compatibility(cpu_count, ram_total, cuda_version):
+    """Return (compatible, messages) for the minimum ML requirements."""
+    messages = []
+    if cpu_count < 4:
+        messages.append(
+            "Your system has less than 4 CPU cores, which may affect performance."
+        )
+    if ram_total < 8 * (1024**3):
+        messages.append(
+            "Your system has less than 8 GB of RAM, which may affect performance."
+        )
+    if not cuda_version:
+        messages.append(
+            "CUDA is not detected, which may limit GPU acceleration capabilities."
+        )
+    return not messages, messages
+
+
+@probe("cpu")
+def cpu_probe(inputs):
+    """CPU model, core count and maximum frequency."""
+    frequency = psutil.cpu_freq()
+    return {
+        "model": query_cpu_name(),
+        "cores": psutil.cpu_count(),
+        "physical_cores": psutil.cpu_count(logical=False),
+        "max_mhz": frequency.max if frequency else None,
+    }
+
+
+@probe("memory")
+def memory_probe(inputs):
+    """Total and available system memory."""
+    memory = psutil.virtual_memory()
+    return {"total": memory.total, "available": memory.available}
+
+
+@probe("cuda", timeout=20)
+def cuda_probe(inputs):
+    """CUDA toolkit version reported by nvcc."""
+    return {"version": query_cuda_version()}
+
+
+@probe("gpus", timeout=20)
+def gpus_probe(inputs):
+    """NVIDIA GPUs reported by nvidia-smi."""
+    try:
+        gpus = query_gpu_info()
+    except (subprocess.SubprocessError, OSError):
+        gpus = []
+    return [
+        {key: gpu[key] for key in ("index", "name", "driver_version", "memory_total")}
+        for gpu in gpus
+    ]
+
+
+@probe("compatibility", requires=("cpu", "memory", "cuda"))
+def compatibility_probe(inputs):
+    """Minimum requirements for ML workloads."""
+    compatible, messages = evaluate_compatibility(
+        inputs["cpu"]["cores"], inputs["memory"]["total"], inputs["cuda"]["version"]
+    )
+    return {"compatible": compatible, "messages": messages}
+
+
+@probe("pytorch", executor="process", module="torch", timeout=120)
+def pytorch_probe(inputs):
+    """PyTorch version and CUDA support."""
+    try:
+        import torch
+    except ImportError:
+        return {"installed": False}
+    cuda_available = torch.cuda.is_available()
+    return {
+        "installed": True,
+        "version": torch.__version__,
+        "cuda": torch.version.cuda,
+        "cuda_available": cuda_available,
+        "devices": torch.cuda.device_count() if cuda_available else 0,
+    }
+
+
+@probe("tensorflow", executor="process", module="tensorflow", timeout=120)
+def tensorflow_probe(inputs):
+    """TensorFlow version and visible GPUs."""
+    try:
+        import tensorflow as tf
+    except ImportError:
+        return {"installed": False}
+    return {
+        "installed": True,
+        "version": tf.__version__,
+        "gpus": len(tf.config.list_physical_devices("GPU")),
+    }
+
+
+@probe("jax", executor="process", module="jax", timeout=120)
+def jax_probe(inputs):
+    """JAX version and device platforms."""
+    try:
+        import jax
+    except ImportError:
+        return {"installed": False}
+    return {
+        "installed": True,
+        "version": jax.__version__,
+        "platforms": sorted({device.platform for device in jax.devices()}),
+    }
+
+
+@probe("onnxruntime", executor="process", module="onnxruntime", timeout=60)
+def onnxruntime_probe(inputs):
+    """ONNX Runtime version and execution providers."""
+    try:
+        import onnxruntime
+    except ImportError:
+        return {"installed": False}
+    return {
+        "installed": True,
+        "version": onnxruntime.__version__,
+        "providers": onnxruntime.get_available_providers(),
+    }
+
+
+@probe("openvino", executor="process", module="openvino", timeout=60)
+def openvino_probe(inputs):
+    """OpenVINO version and available devices."""
+    try:
+        import openvino
+    except ImportError:
+        return {"installed": False}
+    core = openvino.Core() if hasattr(openvino, "Core") else openvino.runtime.Core()
+    get_version = getattr(openvino, "get_version", None) or openvino.runtime.get_version
+    return {
+        "installed": True,
+        "version": get_version(),
+        "devices": core.available_devices,
+    }
+
+
+@probe("triton", executor="process", module="triton", timeout=60)
+def triton_probe(inputs):
+    """Triton compiler version."""
+    try:
+        import triton
+    except ImportError:
+        return {"installed": False}
+    return {"installed": True, "version": triton.__version__}
+
+
+@probe("nccl")
+def nccl_probe(inputs):
+    """NCCL library version, read through ncclGetVersion."""
+    library = ctypes.util.find_library("nccl") or "libnccl.so.2"
+    try:
+        nccl = ctypes.CDLL(library)
+    except OSError:
+        return {"installed": False}
+    code = ctypes.c_int()
+    if nccl.ncclGetVersion(ctypes.byref(code)) != 0:
+        raise ProbeError("ncclGetVersion failed")
+    code = code.value
+    # NCCL 2.9 switched from major*1000 to major*10000 version codes
+    if code >= 10000:
+        major, minor, patch = code // 10000, code // 100 % 100, code % 100
+    else:
+        major, minor, patch = code // 1000, code // 100 % 10, code % 100
+    return {"installed": True, "version": f"{major}.{minor}.{patch}"}
@@ -0,0 +1,144 @@
+"""Per-process CPU and GPU attribution.
+
+``ProcessTracker`` keeps one ``psutil.Process`` per process across sampler
+ticks, so ``cpu_percent`` is measured between ticks without sleeping, and
+reads the expensive details (command line, RSS, threads) only for the
+processes that make it into the top-N view. This keeps a tick cheap on hosts
+running thousands of processes. Processes are keyed on (PID, create time) so
+a reused PID is never shown with another process's history or command line.
+"""
+
+import psutil
+
+SORT_KEYS = ("cpu_percent", "gpu_memory_mb", "rss_mb", "threads")
+
+
+class ProcessTracker:
+    def __init__(self):
+        # (pid, create_time) -> psutil.Process / command line
+        self.processes = {}
+        self.cmdlines = {}
+
+    def _refresh_pids(self):
+        # process_iter checks every cached PID against its create time and
+        # hands out a new Process when the PID was reused
+        processes = {}
+        for process in psutil.process_iter():
+            try:
+                key = (process.pid, process.create_time())
+                if key not in self.processes:
+                    # The first call only primes the CPU counters
+                    process.cpu_percent(interval=None)
+                processes[key] = self.processes.get(key, process)
+            except psutil.Error:
+                pass
+        self.processes = processes
+        for key in list(self.cmdlines):
+            if key not in processes:
+                del self.cmdlines[key]
+
+    def _details(self, key, process):
+        with process.oneshot():
+            rss = process.memory_info().rss
+            threads = process.num_threads()
+            name = process.name()
+        if key not in self.cmdlines:
+            try:
+                self.cmdlines[key] = " ".join(process.cmdline()) or name
+            except psutil.AccessDenied:
+                self.cmdlines[key] = name
+        return name, rss, threads
+
+    def sample(self, gpu_processes=(), gpus=(), top_n=10, sort_by="cpu_percent"):
+        """Return the top ``top_n`` processes as dictionaries.
+
+        ``gpu_processes`` are rows from ``get_gpu_processes`` and ``gpus``
+        rows from ``get_gpu_info``, used to name the GPUs a process holds.
+        """
+        if sort_by not in SORT_KEYS:
+            raise ValueError(f"Cannot sort processes by {sort_by!r}")
+        self._refresh_pids()
+
+        gpu_index = {gpu["pci_bus_id"]: gpu["index"] for gpu in gpus}
+        gpu_memory = {}
+        gpu_names = {}
+        for row in gpu_processes:
+            pid = row["pid"]
+            try:
+                memory = float(row["used_memory"])
+            except (TypeError, ValueError):
+                memory = 0.0
+            gpu_memory[pid] = gpu_memory.get(pid, 0.0) + memory
+            gpu_names.setdefault(pid, []).append(
+                gpu_index.get(row["gpu_bus_id"], row["gpu_bus_id"])
+            )
+
+        cpu = {}
+        for key, process in list(self.processes.items()):
+            try:
+                cpu[key] = process.cpu_percent(interval=None)
+            except psutil.Error:
+                del self.processes[key]
+                self.cmdlines.pop(key, None)
+
+        # Only the sort key is read for every process; everything else is
+        # fetched for the candidates that can end up in the view.
+        if sort_by == "cpu_percent":
+            ranking = cpu
+        elif sort_by == "gpu_memory_mb":
+            ranking = {key: gpu_memory[key[0]] for key in cpu if key[0] in gpu_memory}
+        else:
+            ranking = {}
+            for key in cpu:
+                try:
+                    process = self.processes[key]
+                    if sort_by == "rss_mb":
+                        ranking[key] = process.memory_info().rss
+                    else:
+                        ranking[key] = process.num_threads()
+                except psutil.Error:
+                    pass
+        candidates = [
+            key
+            for key in sorted(ranking, key=ranking.get, reverse=True)
+            if key in self.processes
+        ][:top_n]
+
+        rows = []
+        for key in candidates:
+            pid = key[0]
+            try:
+                name, rss, threads = self._details(key, self.processes[key])
+            except psutil.Error:
+                continue
+            rows.append(
+                {
+                    "pid": pid,
+                    "name": name,
+                    "cmdline": self.cmdlines[key],
+                    "cpu_percent": cpu.get(key, 0.0),
+                    "rss_mb": rss / 1024**2,
+                    "threads": threads,
+                    "gpu_memory_mb": gpu_memory.get(pid, 0.0),
+                    "gpus": gpu_names.get(pid, []),
+                }
+            )
+        rows.sort(key=lambda row: row[sort_by], reverse=True)
+        return rows[:top_n]
+
+
+def format_process_table(rows, width=120):
+    header = (
+        f"{'PID':>8} {'CPU %':>7} {'RSS MB':>9} {'Thr':>5} "
+        f"{'GPU MB':>8} {'GPUs':<6} Command"
+    )
+    lines = [header]
+    command_width = max(10, width - len(header) + len("Command"))
+    for row in rows:
+        gpus = ",".join(row["gpus"]) or "-"
+        lines.append(
+            f"{row['pid']:>8} {row['cpu_percent']:>7.1f} {row['rss_mb']:>9.1f} "
+            f"{row['threads']:>5} {row['gpu_memory_mb']:>8.0f} {gpus:<6} "
+            f"{row['cmdline'][:command_width]}"
+        )
+    return "\n".join(lines)
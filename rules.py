@@ -0,0 +1,401 @@
+"""Declarative threshold and alert rules evaluated on every sampler tick.
+
+Rules are loaded from a TOML (or, with PyYAML installed, YAML) file::
+
+    [notify]
+    webhook = "http://127.0.0.1:9000/alerts"
+    command = ["/usr/local/bin/notify-oncall"]
+
+    [[rules]]
+    name = "gpu-overheating"
+    metric = "temperature"
+    op = ">"
+    threshold = 85
+    clear = 80          # hysteresis: stays active until the value drops to 80
+    for = 60            # seconds the condition must hold before firing
+    severity = "critical"
+
+    [[rules]]
+    name = "gpu-idle-but-held"
+    severity = "warning"
+    conditions = [
+        { metric = "gpu_utilization", op = "<", threshold = 10 },
+        { metric = "compute_processes", op = ">", threshold = 0 },
+    ]
+
+Metrics are either per GPU (one column entry per device) or host wide. Each
+rule is evaluated column-wise across all GPUs in one pass per tick, fires
+once per episode and emits a single "resolved" alert when it clears.
+"""
+
+import json
+import logging
+import operator
+import os
+import subprocess
+import threading
+import time
+import urllib.request
+
+OPERATORS = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+GPU_NUMERIC_FIELDS = (
+    "memory_total",
+    "memory_free",
+    "memory_used",
+    "gpu_utilization",
+    "memory_utilization",
+    "temperature",
+    "power_draw",
+    "power_limit",
+    "sm_clock",
+    "memory_clock",
+    "pcie_link_gen_current",
+    "pcie_link_gen_max",
+)
+
+
+class RuleConfigError(ValueError):
+    pass
+
+
+class _Missing:
+    """Stands in for an unavailable metric value in alert messages."""
+
+    def __format__(self, spec):
+        return "-"
+
+    def __str__(self):
+        return "-"
+
+
+MISSING = _Missing()
+
+
+def parse_number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        # nvidia-smi reports unsupported fields as "[N/A]"
+        return None
+
+
+def _ratio(numerator, denominator):
+    if numerator is None or not denominator:
+        return None
+    return numerator / denominator * 100
+
+
+def gpu_metric_columns(gpus, processes=None):
+    """Turn ``get_gpu_info`` rows into per-GPU metric columns.
+
+    ``processes`` are optional ``get_gpu_processes`` rows used to count the
+    compute processes holding each GPU.
+    """
+    columns = {"gpu": [gpu["index"] for gpu in gpus]}
+    for field in GPU_NUMERIC_FIELDS:
+        columns[field] = [parse_number(gpu[field]) for gpu in gpus]
+    columns["memory_used_pct"] = [
+        _ratio(used, total)
+        for used, total in zip(columns["memory_used"], columns["memory_total"])
+    ]
+    columns["power_pct"] = [
+        _ratio(draw, limit)
+        for draw, limit in zip(columns["power_draw"], columns["power_limit"])
+    ]
+    columns["pcie_gen_deficit"] = [
+        None if current is None or maximum is None else maximum - current
+        for current, maximum in zip(
+            columns["pcie_link_gen_current"], columns["pcie_link_gen_max"]
+        )
+    ]
+    if processes is not None:
+        counts = {}
+        for process in processes:
+            counts[process["gpu_bus_id"]] = counts.get(process["gpu_bus_id"], 0) + 1
+        columns["compute_processes"] = [
+            counts.get(gpu["pci_bus_id"], 0) for gpu in gpus
+        ]
+    return columns
+
+
+class Condition:
+    def __init__(self, metric, op, threshold, clear=None):
+        if op not in OPERATORS:
+            raise RuleConfigError(f"Unknown operator {op!r} for metric {metric}")
+        for value in (threshold, clear):
+            if value is not None and (
+                isinstance(value, bool) or not isinstance(value, (int, float))
+            ):
+                raise RuleConfigError(
+                    f"Threshold {value!r} for metric {metric} is not a number"
+                )
+        self.metric = metric
+        self.op = op
+        self.compare = OPERATORS[op]
+        self.threshold = threshold
+        self.clear = threshold if clear is None else clear
+
+    def mask(self, column, firing):
+        """Evaluate the condition for every target at once.
+
+        Targets whose alert is already firing are compared against the
+        ``clear`` threshold instead, which gives the rule its hysteresis.
+        """
+        return [
+            value is not None
+            and self.compare(value, self.clear if active else self.threshold)
+            for value, active in zip(column, firing)
+        ]
+
+
+class Rule:
+    def __init__(self, name, conditions, duration=0, severity="warning", message=None):
+        self.name = name
+        self.conditions = conditions
+        self.duration = duration
+        self.severity = severity
+        self.message = message
+
+    @classmethod
+    def from_dict(cls, data):
+        if "name" not in data:
+            raise RuleConfigError(f"Rule without a name: {data}")
+        if "conditions" in data:
+            specs = data["conditions"]
+        elif "metric" in data:
+            specs = [data]
+        else:
+            raise RuleConfigError(f"Rule {data['name']} has no conditions")
+        try:
+            conditions = [
+                Condition(
+                    spec["metric"], spec["op"], spec["threshold"], spec.get("clear")
+                )
+                for spec in specs
+            ]
+        except KeyError as e:
+            raise RuleConfigError(f"Rule {data['name']} is missing {e}") from None
+        message = data.get("message")
+        if message is not None:
+            try:
+                message.format(rule=data["name"], metric="metric", value=0.0, gpu="0")
+            except (KeyError, IndexError, ValueError, AttributeError) as e:
+                raise RuleConfigError(
+                    f"Rule {data['name']} has an invalid message template: {e}"
+                ) from None
+        duration = data.get("for", 0)
+        if (
+            isinstance(duration, bool)
+            or not isinstance(duration, (int, float))
+            or duration < 0
+        ):
+            raise RuleConfigError(
+                f"Rule {data['name']} has an invalid duration {duration!r}"
+            )
+        severity = data.get("severity", "warning")
+        if not isinstance(severity, str):
+            raise RuleConfigError(
+                f"Rule {data['name']} has an invalid severity {severity!r}"
+            )
+        return cls(
+            data["name"],
+            conditions,
+            duration=duration,
+            severity=severity,
+            message=data.get("message"),
+        )
+
+    @property
+    def metrics(self):
+        return {condition.metric for condition in self.conditions}
+
+
+class Alert:
+    def __init__(self, rule, state, gpu, value, timestamp):
+        self.rule = rule.name
+        self.severity = rule.severity
+        self.state = state
+        self.gpu = gpu
+        self.value = value
+        self.timestamp = timestamp
+        metric = rule.conditions[0].metric
+        template = rule.message or "{rule}: {metric} = {value}"
+        # A metric that just became "[N/A]" still has to produce a message,
+        # whatever format spec the template applies to it
+        self.message = template.format(
+            rule=rule.name,
+            metric=metric,
+            value=MISSING if value is None else value,
+            gpu=gpu,
+        )
+        if gpu is not None and "{gpu}" not in template:
+            self.message = f"GPU {gpu}: {self.message}"
+
+    def to_dict(self):
+        return {
+            "rule": self.rule,
+            "severity": self.severity,
+            "state": self.state,
+            "gpu": self.gpu,
+            "value": self.value,
+            "timestamp": self.timestamp,
+            "message": self.message,
+        }
+
+    def __str__(self):
+        prefix = "RESOLVED" if self.state == "resolved" else self.severity.upper()
+        return f"[{prefix}] {self.message}"
+
+
+class RuleEngine:
+    """Evaluates rules against metric samples and tracks alert state."""
+
+    def __init__(self, rules):
+        self.rules = rules
+        # (rule name, target) -> time the condition started holding
+        self.pending_since = {}
+        self.firing = set()
+
+    @property
+    def required_metrics(self):
+        metrics = set()
+        for rule in self.rules:
+            metrics |= rule.metrics
+        return metrics
+
+    def evaluate(self, sample, now=None):
+        """Evaluate all rules and return newly fired and resolved alerts.
+
+        ``sample`` maps metric names to a list with one value per GPU or to a
+        single host-wide value; the "gpu" entry labels the GPU columns.
+        """
+        now = time.time() if now is None else now
+        gpus = sample.get("gpu", [])
+        alerts = []
+        for rule in self.rules:
+            per_gpu = any(
+                isinstance(sample.get(metric), list) for metric in rule.metrics
+            )
+            targets = gpus if per_gpu else [None]
+            firing = [(rule.name, target) in self.firing for target in targets]
+
+            holds = [True] * len(targets)
+            for condition in rule.conditions:
+                column = sample.get(condition.metric)
+                if not isinstance(column, list):
+                    column = [column] * len(targets)
+                holds = [a and b for a, b in zip(holds, condition.mask(column, firing))]
+
+            first_metric = rule.conditions[0].metric
+            values = sample.get(first_metric)
+            for position, target in enumerate(targets):
+                key = (rule.name, target)
+                value = values[position] if isinstance(values, list) else values
+                if holds[position]:
+                    started = self.pending_since.setdefault(key, now)
+                    if key not in self.firing and now - started >= rule.duration:
+                        self.firing.add(key)
+                        alerts.append(Alert(rule, "firing", target, value, now))
+                else:
+                    self.pending_since.pop(key, None)
+                    if key in self.firing:
+                        self.firing.discard(key)
+                        alerts.append(Alert(rule, "resolved", target, value, now))
+        return alerts
+
+
+class AlertNotifier:
+    """Sends alerts to the log and optional webhook and command hooks.
+
+    Hooks run on background threads so a slow endpoint never stalls a tick.
+    """
+
+    def __init__(self, webhook=None, command=None, timeout=10):
+        self.webhook = webhook
+        self.command = command
+        self.timeout = timeout
+        self.deliveries = []
+
+    def notify(self, alerts):
+        for alert in alerts:
+            if alert.state == "resolved":
+                logging.info(f"Alert resolved: {alert.message}")
+            elif alert.severity == "critical":
+                logging.critical(f"Alert: {alert.message}")
+            else:
+                logging.warning(f"Alert: {alert.message}")
+        if alerts and (self.webhook or self.command):
+            payload = json.dumps([alert.to_dict() for alert in alerts]).encode("utf-8")
+            thread = threading.Thread(
+                target=self._deliver, args=(payload,), daemon=True
+            )
+            thread.start()
+            self.deliveries = [t for t in self.deliveries if t.is_alive()] + [thread]
+
+    def flush(self):
+        """Wait for pending hook deliveries, e.g. before a CLI run exits."""
+        for thread in self.deliveries:
+            thread.join(self.timeout * 2)
+        self.deliveries = []
+
+    def _deliver(self, payload):
+        if self.webhook:
+            try:
+                request = urllib.request.Request(
+                    self.webhook,
+                    data=payload,
+                    headers={"Content-Type": "application/json"},
+                )
+                urllib.request.urlopen(request, timeout=self.timeout).close()
+            except Exception as e:
+                logging.error(f"Failed to deliver alerts to {self.webhook}: {e}")
+        if self.command:
+            try:
+                subprocess.run(
+                    self.command, input=payload, timeout=self.timeout, check=True
+                )
+            except Exception as e:
+                logging.error(f"Alert command {self.command} failed: {e}")
+
+
+def load_rules(path):
+    """Load a rules file and return a (RuleEngine, AlertNotifier) pair."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise RuleConfigError("PyYAML is required for YAML rule files") from None
+        with open(path) as f:
+            try:
+                config = yaml.safe_load(f) or {}
+            except yaml.YAMLError as e:
+                raise RuleConfigError(f"Invalid YAML in {path}: {e}") from None
+    else:
+        try:
+            import tomllib
+        except ImportError:  # Python < 3.11
+            import tomli as tomllib
+
+        with open(path, "rb") as f:
+            try:
+                config = tomllib.load(f)
+            except tomllib.TOMLDecodeError as e:
+                raise RuleConfigError(f"Invalid TOML in {path}: {e}") from None
+    if not isinstance(config, dict):
+        raise RuleConfigError(f"{path} must contain a table of rules")
+
+    rules = [Rule.from_dict(data) for data in config.get("rules", [])]
+    notify = config.get("notify", {})
+    command = notify.get("command")
+    if isinstance(command, str):
+        command = [command]
+    return RuleEngine(rules), AlertNotifier(notify.get("webhook"), command)
@@ -0,0 +1,341 @@
+"""Headless metric sampler and the ``--cli --watch`` loop.
+
+GPU metrics come from a single long-running ``nvidia-smi -lms`` process whose
+output is parsed on a background thread, so steady-state sampling spawns no
+subprocesses at all. Snapshots are rendered either as a compact redrawing
+table or as newline-delimited JSON, and written to stdout in batches.
+"""
+
+import json
+import logging
+import math
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+
+import psutil
+
+from instrumentation import profiler
+from processes import ProcessTracker
+from rules import GPU_NUMERIC_FIELDS, gpu_metric_columns, parse_number
+
+GPU_FIELDS = (
+    ("index", "index"),
+    ("name", "name"),
+    ("pci_bus_id", "pci.bus_id"),
+    ("driver_version", "driver_version"),
+    ("vbios_version", "vbios_version"),
+    ("memory_total", "memory.total"),
+    ("memory_free", "memory.free"),
+    ("memory_used", "memory.used"),
+    ("gpu_utilization", "utilization.gpu"),
+    ("memory_utilization", "utilization.memory"),
+    ("temperature", "temperature.gpu"),
+    ("power_draw", "power.draw"),
+    ("power_limit", "power.limit"),
+    ("sm_clock", "clocks.current.sm"),
+    ("memory_clock", "clocks.current.memory"),
+    ("pstate", "pstate"),
+    ("pcie_link_gen_current", "pcie.link.gen.current"),
+    ("pcie_link_gen_max", "pcie.link.gen.max"),
+)
+GPU_QUERY = [
+    "nvidia-smi",
+    "--query-gpu=" + ",".join(query for _, query in GPU_FIELDS),
+    "--format=csv,noheader,nounits",
+]
+CLEAR_SCREEN = "\x1b[H\x1b[2J"
+# Seconds a one-shot nvidia-smi query may take before the driver is
+# considered hung
+QUERY_TIMEOUT = 10
+
+
+def parse_gpu_info(lines):
+    """Parse ``GPU_QUERY`` output lines into one dictionary per GPU."""
+    return [
+        dict(zip((key for key, _ in GPU_FIELDS), line.split(", ")))
+        for line in lines
+        if line.strip()
+    ]
+
+
+def query_gpu_info():
+    output = subprocess.check_output(GPU_QUERY, timeout=QUERY_TIMEOUT).decode("utf-8")
+    return parse_gpu_info(output.strip().split("\n"))
+
+
+def query_gpu_processes():
+    """Return the compute processes running on each GPU."""
+    output = subprocess.check_output(
+        [
+            "nvidia-smi",
+            "--query-compute-apps=gpu_bus_id,pid,used_memory",
+            "--format=csv,noheader,nounits",
+        ],
+        timeout=QUERY_TIMEOUT,
+    ).decode("utf-8")
+    processes = []
+    for line in output.strip().split("\n"):
+        values = line.split(", ")
+        if len(values) == 3 and values[1].isdigit():
+            processes.append(
+                {
+                    "gpu_bus_id": values[0],
+                    "pid": int(values[1]),
+                    "used_memory": values[2],
+                }
+            )
+    return processes
+
+
+class GpuStream:
+    """Keeps the latest ``nvidia-smi`` reading from a looping nvidia-smi.
+
+    A reading older than ``stale_after`` seconds (the stream exited or hung)
+    is dropped rather than reported under a fresh timestamp.
+    """
+
+    def __init__(self, interval, restart_delay=60, stale_after=None):
+        self.interval_ms = max(100, int(interval * 1000))
+        self.restart_delay = restart_delay
+        if stale_after is None:
+            stale_after = max(2.0, 3 * self.interval_ms / 1000)
+        self.stale_after = stale_after
+        self.process = None
+        self.gpu_count = 0
+        self.latest = []
+        self.updated_at = 0
+        self.started_at = 0
+        self._lock = threading.Lock()
+
+    def start(self):
+        self.started_at = time.monotonic()
+        try:
+            self.latest = query_gpu_info()
+        except (subprocess.SubprocessError, OSError):
+            self.latest = []
+        self.updated_at = time.monotonic()
+        self.gpu_count = len(self.latest)
+        if not self.gpu_count:
+            return
+        self.process = subprocess.Popen(
+            GPU_QUERY + ["-lms", str(self.interval_ms)],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+        )
+        threading.Thread(target=self._read, args=(self.process,), daemon=True).start()
+
+    def _read(self, process):
+        batch = []
+        for line in process.stdout:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("0, ") and batch:
+                # A new reading started before the previous one completed
+                batch = []
+            batch.append(line)
+            if len(batch) == self.gpu_count:
+                gpus = parse_gpu_info(batch)
+                with self._lock:
+                    self.latest = gpus
+                    self.updated_at = time.monotonic()
+                batch = []
+
+    def read(self):
+        if self.process is not None and self.process.poll() is not None:
+            if time.monotonic() - self.started_at >= self.restart_delay:
+                logging.warning("nvidia-smi stream exited; restarting it.")
+                self.start()
+        with self._lock:
+            if time.monotonic() - self.updated_at > self.stale_after:
+                return []
+            return self.latest
+
+    def stop(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+
+class Sampler:
+    """Produces JSON-serialisable snapshots of host and GPU metrics."""
+
+    def __init__(self, interval, rule_engine=None, alert_notifier=None, top_n=0):
+        self.gpu_stream = GpuStream(interval)
+        self.rule_engine = rule_engine
+        self.alert_notifier = alert_notifier
+        self.top_n = top_n
+        self.process_tracker = ProcessTracker() if top_n else None
+        self.host = socket.gethostname()
+        self.needs_gpu_processes = top_n > 0 or (
+            rule_engine is not None
+            and "compute_processes" in rule_engine.required_metrics
+        )
+
+    def start(self):
+        psutil.cpu_percent(interval=None)
+        self.gpu_stream.start()
+
+    def stop(self):
+        self.gpu_stream.stop()
+        if self.alert_notifier is not None:
+            self.alert_notifier.flush()
+
+    def get_gpu_processes(self):
+        try:
+            return query_gpu_processes()
+        except (subprocess.SubprocessError, OSError):
+            return []
+
+    @profiler.traced("sampler tick", category="sampler")
+    def snapshot(self):
+        now = time.time()
+        memory = psutil.virtual_memory()
+        gpus = self.gpu_stream.read()
+        snapshot = {
+            "timestamp": now,
+            "host": self.host,
+            "cpu_percent": psutil.cpu_percent(interval=None),
+            "ram_used_pct": memory.percent,
+            "ram_used_gb": round(memory.used / 1024**3, 2),
+            "gpus": [
+                {
+                    key: parse_number(value) if key in GPU_NUMERIC_FIELDS else value
+                    for key, value in gpu.items()
+                }
+                for gpu in gpus
+            ],
+        }
+
+        gpu_processes = self.get_gpu_processes() if self.needs_gpu_processes else None
+        if self.rule_engine is not None:
+            sample = gpu_metric_columns(gpus, gpu_processes)
+            sample["ram_used_pct"] = memory.percent
+            sample["cpu_percent"] = snapshot["cpu_percent"]
+            alerts = self.rule_engine.evaluate(sample, now=now)
+            self.alert_notifier.notify(alerts)
+            snapshot["alerts"] = [alert.to_dict() for alert in alerts]
+        if self.process_tracker is not None:
+            snapshot["processes"] = self.process_tracker.sample(
+                gpu_processes or [], gpus, top_n=self.top_n
+            )
+        return snapshot
+
+
+def _cell(value, spec):
+    return format(value, spec) if value is not None else "-"
+
+
+def format_snapshot_table(snapshot):
+    when = datetime.fromtimestamp(snapshot["timestamp"]).strftime("%Y-%m-%d %H:%M:%S")
+    lines = [
+        f"{snapshot['host']}  {when}  CPU {snapshot['cpu_percent']:5.1f}%  "
+        f"RAM {snapshot['ram_used_pct']:5.1f}% ({snapshot['ram_used_gb']:.1f} GB)",
+        "",
+        f"{'GPU':>3} {'Util%':>6} {'Mem MB':>15} {'Temp':>5} {'Power W':>15} "
+        f"{'SM MHz':>7} {'PCIe':>5}  Name",
+    ]
+    for gpu in snapshot["gpus"]:
+        memory = (
+            f"{_cell(gpu['memory_used'], '.0f')}/{_cell(gpu['memory_total'], '.0f')}"
+        )
+        power = f"{_cell(gpu['power_draw'], '.0f')}/{_cell(gpu['power_limit'], '.0f')}"
+        pcie = (
+            f"{_cell(gpu['pcie_link_gen_current'], '.0f')}/"
+            f"{_cell(gpu['pcie_link_gen_max'], '.0f')}"
+        )
+        lines.append(
+            f"{gpu['index']:>3} {_cell(gpu['gpu_utilization'], '6.0f')} "
+            f"{memory:>15} {_cell(gpu['temperature'], '5.0f')} {power:>15} "
+            f"{_cell(gpu['sm_clock'], '7.0f')} {pcie:>5}  {gpu['name']}"
+        )
+    if not snapshot["gpus"]:
+        lines.append("  no NVIDIA GPUs detected")
+    if snapshot.get("processes"):
+        lines += ["", f"{'PID':>8} {'CPU %':>7} {'RSS MB':>9} {'GPU MB':>8}  Command"]
+    for process in snapshot.get("processes", []):
+        lines.append(
+            f"{process['pid']:>8} {process['cpu_percent']:>7.1f} "
+            f"{process['rss_mb']:>9.1f} {process['gpu_memory_mb']:>8.0f}  "
+            f"{process['cmdline'][:60]}"
+        )
+    for alert in snapshot.get("alerts", []):
+        lines.append(f"{alert['state'].upper():>8} {alert['message']}")
+    return "\n".join(lines) + "\n"
+
+
+def _terminate(signum, frame):
+    # docker stop and systemd send SIGTERM; stop the same way as Ctrl-C so
+    # buffered snapshots are written and the sampler is cleaned up
+    raise KeyboardInterrupt
+
+
+def watch(sampler, interval, output="table", batch=1, count=None, stream=None):
+    """Sample every ``interval`` seconds and write snapshots to ``stream``.
+
+    JSON-lines output is written ``batch`` snapshots at a time; the table is
+    redrawn in place on every sample. Runs until interrupted or until
+    ``count`` snapshots have been taken.
+    """
+    stream = stream or sys.stdout
+    stop = threading.Event()
+    buffer = []
+    taken = 0
+    sampler.start()
+    # Signal handlers can only be installed from the main thread
+    handle_sigterm = threading.current_thread() is threading.main_thread()
+    if handle_sigterm:
+        previous_handler = signal.signal(signal.SIGTERM, _terminate)
+    next_tick = time.monotonic()
+    try:
+        while count is None or taken < count:
+            snapshot = sampler.snapshot()
+            taken += 1
+            if output == "json":
+                buffer.append(json.dumps(snapshot, separators=(",", ":")) + "\n")
+                if len(buffer) >= batch:
+                    stream.write("".join(buffer))
+                    stream.flush()
+                    buffer = []
+            else:
+                stream.write(CLEAR_SCREEN + format_snapshot_table(snapshot))
+                stream.flush()
+            if count is not None and taken >= count:
+                break
+            # Schedule against a fixed grid so ticks do not drift, but skip
+            # the slots missed during a stall (SIGSTOP, suspend, a slow
+            # driver) instead of sampling them back to back
+            next_tick += interval
+            now = time.monotonic()
+            if interval > 0 and next_tick <= now:
+                next_tick += (math.floor((now - next_tick) / interval) + 1) * interval
+            stop.wait(max(0.0, next_tick - now))
+    except KeyboardInterrupt:
+        pass
+    except BrokenPipeError:
+        # The reader went away (e.g. piped into head). Point stdout at
+        # /dev/null so the interpreter's final flush does not fail again.
+        buffer = []
+        if stream is sys.stdout:
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+    finally:
+        if buffer:
+            stream.write("".join(buffer))
+            stream.flush()
+        sampler.stop()
+        if handle_sigterm:
+            # None means the previous handler was not installed from Python
+            if previous_handler is None:
+                previous_handler = signal.SIG_DFL
+            signal.signal(signal.SIGTERM, previous_handler)
+    return 0
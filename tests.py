@@ -1,7 +1,26 @@
+import io
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
 import unittest
 from unittest.mock import patch, MagicMock
+import psutil
 from PySide6.QtWidgets import QApplication
-from mlframework_checker import MLFrameworkChecker
+from PySide6.QtCore import QProcess
+from mlframework_checker import MLFrameworkChecker, build_pip_install_command
+from instrumentation import Profiler
+from benchmarks import compare, install_fake_tools
+import coldstart
+from history import HistoryStore, compare_runs, mann_whitney_less
+from rules import Rule, RuleConfigError, RuleEngine, gpu_metric_columns, load_rules
+from processes import ProcessTracker
+from probes import Probe, ProbeError, ProbeRegistry, cpu_probe, run_probes
+from sampler import GpuStream, watch
 
 
 class TestMLFrameworkChecker(unittest.TestCase):
@@ -16,12 +35,27 @@ class TestMLFrameworkChecker(unittest.TestCase):
         self.assertIsNotNone(self.checker)
         self.assertEqual(self.checker.windowTitle(), "ML Framework and CUDA Checker")
 
-    @patch("subprocess.check_call")
-    def test_install_package(self, mock_check_call):
-        mock_check_call.return_value = 0
-        result = self.checker.install_package("test_package")
+    @patch("mlframework_checker.QProcess.start")
+    def test_install_package(self, mock_start):
+        on_finished = MagicMock()
+        result = self.checker.install_package("test_package", on_finished)
         self.assertTrue(result)
-        mock_check_call.assert_called_once()
+        mock_start.assert_called_once()
+        program, arguments = mock_start.call_args[0]
+        self.assertEqual(arguments[-1], "test_package")
+
+        # A second install is refused while the first one is running
+        self.assertFalse(self.checker.install_package("other_package"))
+
+        self.checker.on_install_finished(0, QProcess.NormalExit)
+        on_finished.assert_called_once_with(True)
+        self.assertIsNone(self.checker.install_process)
+
+    def test_build_pip_install_command_wheelhouse(self):
+        command = build_pip_install_command(["torch", "tensorflow"], "/opt/wheels")
+        self.assertIn("--no-index", command)
+        self.assertEqual(command[command.index("--find-links") + 1], "/opt/wheels")
+        self.assertEqual(command[-2:], ["torch", "tensorflow"])
 
     @patch("subprocess.check_output")
     def test_get_cuda_version(self, mock_check_output):
@@ -29,6 +63,16 @@ class TestMLFrameworkChecker(unittest.TestCase):
         version = self.checker.get_cuda_version()
         self.assertEqual(version, "11.2")
 
+    def test_get_gpu_info_with_fake_nvidia_smi(self):
+        with tempfile.TemporaryDirectory() as tools_dir, patch.dict(
+            os.environ, {"FAKE_GPU_COUNT": "64"}
+        ):
+            install_fake_tools(tools_dir)
+            gpus = self.checker.get_gpu_info()
+        self.assertEqual(len(gpus), 64)
+        self.assertEqual(gpus[63]["index"], "63")
+        self.assertEqual(gpus[0]["pcie_link_gen_max"], "4")
+
     @patch("psutil.cpu_freq")
     @patch("psutil.virtual_memory")
     @patch("subprocess.check_output")
@@ -57,6 +101,527 @@ class TestMLFrameworkChecker(unittest.TestCase):
             self.checker.compatibility_label.toPlainText(), "Your system is compatible."
         )
 
+    @patch("mlframework_checker.run_performance_probes")
+    def test_performance_probes_run_off_the_gui_thread(self, mock_probes):
+        threads = []
+
+        def probes(storage_dir):
+            threads.append(threading.get_ident())
+            return [("memory", "copy_bandwidth", 10.0, "GB/s")]
+
+        mock_probes.side_effect = probes
+        self.checker.interactive = False
+        self.checker.storage_dir = "/srv/scratch"
+        history_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(history_dir.cleanup)
+        self.checker.history_path = os.path.join(history_dir.name, "history.db")
+        self.checker.check_performance()
+        button = self.checker.performance_probes_button
+        self.assertFalse(button.isEnabled())
+        deadline = time.monotonic() + 10
+        while not button.isEnabled() and time.monotonic() < deadline:
+            self.app.processEvents()
+            time.sleep(0.01)
+        self.assertTrue(button.isEnabled())
+        self.assertNotEqual(threads, [threading.get_ident()])
+        self.assertEqual(len(threads), 1)
+        mock_probes.assert_called_once_with(storage_dir="/srv/scratch")
+        with HistoryStore(self.checker.history_path) as store:
+            (run,) = store.runs(kind="performance")
+        self.assertEqual(run["config"]["storage_dir"], "/srv/scratch")
+
+    def test_history_configuration_reuses_checked_values(self):
+        with patch.object(
+            self.checker, "get_cuda_version", return_value="12.2"
+        ) as mock_cuda, patch.object(
+            self.checker, "get_gpu_info", return_value=[]
+        ) as mock_gpus:
+            self.checker.check_system_compatibility()
+            self.checker.history_configuration()
+            config = self.checker.history_configuration()
+        self.assertEqual(config["cuda"], "12.2")
+        self.assertEqual(mock_cuda.call_count, 1)
+        self.assertEqual(mock_gpus.call_count, 1)
+
+
+class TestProfiler(unittest.TestCase):
+    def test_disabled_profiler_records_nothing(self):
+        profiler = Profiler()
+        traced = profiler.traced("noop")(lambda: 42)
+        with profiler.span("ignored"):
+            pass
+        self.assertEqual(traced(), 42)
+        self.assertEqual(profiler.spans, [])
+
+    def test_span_records_subprocesses_and_exports_trace(self):
+        profiler = Profiler()
+        profiler.enable()
+        with profiler.span("spawn", category="test"):
+            subprocess.run([sys.executable, "-c", "pass"], check=True)
+        profiler.disable()
+
+        self.assertEqual(len(profiler.spans), 1)
+        self.assertEqual(profiler.spans[0].subprocesses, 1)
+        event = profiler.to_chrome_trace()["traceEvents"][0]
+        self.assertEqual(event["ph"], "X")
+        self.assertEqual(event["cat"], "test")
+        self.assertGreater(event["dur"], 0)
+        self.assertEqual(profiler.summary()[0]["calls"], 1)
+
+    def test_overlapping_spans_count_their_own_thread_subprocesses(self):
+        profiler = Profiler()
+        profiler.enable()
+        entered = threading.Barrier(2)
+        spawned = threading.Barrier(2)
+
+        def work(name, spawns):
+            with profiler.span(name):
+                entered.wait()
+                for _ in range(spawns):
+                    subprocess.run([sys.executable, "-c", "pass"], check=True)
+                spawned.wait()
+
+        threads = [
+            threading.Thread(target=work, args=("one", 1)),
+            threading.Thread(target=work, args=("two", 2)),
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        profiler.disable()
+
+        counts = {span.name: span.subprocesses for span in profiler.spans}
+        self.assertEqual(counts, {"one": 1, "two": 2})
+
+
+class TestBenchmarks(unittest.TestCase):
+    def test_compare_flags_regressions_beyond_threshold(self):
+        baseline = {"probe": {"p50_ms": 10.0, "subprocesses_per_call": 1.0}}
+        results = {"probe": {"p50_ms": 11.5, "subprocesses_per_call": 2.0}}
+        self.assertEqual(
+            compare(results, baseline, 0.25),
+            ["probe: subprocesses_per_call 1.0 -> 2.0"],
+        )
+        self.assertEqual(compare(results, {}, 0.25), [])
+
+
+class TestHistory(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = HistoryStore(os.path.join(self.tmp_dir.name, "history.db"))
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp_dir.cleanup()
+
+    def test_mann_whitney_exact_p_value(self):
+        self.assertAlmostEqual(
+            mann_whitney_less([1, 2, 3, 4, 5], [6, 7, 8, 9, 10]), 1 / 252
+        )
+        self.assertEqual(mann_whitney_less([6, 7, 8, 9, 10], [1, 2, 3, 4, 5]), 1.0)
+
+    def test_compare_flags_drop_and_config_change(self):
+        def samples(gflops):
+            return [("cpu", "gemm_gflops", value, "GFLOP/s") for value in gflops]
+
+        self.store.record_run(
+            "performance",
+            samples([100, 101, 99, 102, 100]),
+            {"nvidia_driver": "535.104.05"},
+            host="node1",
+            timestamp=1,
+        )
+        self.store.record_run(
+            "performance",
+            samples([80, 79, 81, 80, 82]),
+            {"nvidia_driver": "550.54.14"},
+            host="node1",
+            timestamp=2,
+        )
+        result = compare_runs(self.store, host="node1")
+        self.assertEqual(len(result["drops"]), 1)
+        self.assertAlmostEqual(result["drops"][0]["drop"], 0.2)
+        self.assertEqual(
+            result["config_changes"], ["nvidia_driver: 535.104.05 -> 550.54.14"]
+        )
+        self.assertIsNone(compare_runs(self.store, host="other-node"))
+
+
+class TestRules(unittest.TestCase):
+    def test_rule_duration_hysteresis_and_deduplication(self):
+        rule = Rule.from_dict(
+            {
+                "name": "hot",
+                "metric": "temperature",
+                "op": ">",
+                "threshold": 85,
+                "clear": 80,
+                "for": 60,
+            }
+        )
+        engine = RuleEngine([rule])
+
+        def tick(now, temperatures):
+            sample = {"gpu": ["0", "1"], "temperature": temperatures}
+            return [(a.state, a.gpu) for a in engine.evaluate(sample, now=now)]
+
+        self.assertEqual(tick(0, [90, 70]), [])
+        self.assertEqual(tick(30, [90, 70]), [])
+        self.assertEqual(tick(60, [90, 70]), [("firing", "0")])
+        self.assertEqual(tick(65, [91, 70]), [])
+        # Below the threshold but above the clear level keeps the alert active
+        self.assertEqual(tick(70, [82, 70]), [])
+        self.assertEqual(tick(75, [79, 70]), [("resolved", "0")])
+
+    def test_resolve_with_unavailable_value_keeps_evaluating(self):
+        hot = Rule.from_dict(
+            {
+                "name": "hot",
+                "metric": "temperature",
+                "op": ">",
+                "threshold": 85,
+                "message": "GPU {gpu} temperature {value:.0f} C",
+            }
+        )
+        busy = Rule.from_dict(
+            {"name": "busy", "metric": "gpu_utilization", "op": ">", "threshold": 90}
+        )
+        engine = RuleEngine([hot, busy])
+        engine.evaluate({"gpu": ["0"], "temperature": [90], "gpu_utilization": [0]})
+        # nvidia-smi now reports the temperature as [N/A]
+        alerts = engine.evaluate(
+            {"gpu": ["0"], "temperature": [None], "gpu_utilization": [95]}
+        )
+        self.assertEqual(
+            [(alert.rule, alert.state) for alert in alerts],
+            [("hot", "resolved"), ("busy", "firing")],
+        )
+        self.assertEqual(alerts[0].message, "GPU 0 temperature - C")
+        with self.assertRaises(RuleConfigError):
+            Rule.from_dict(
+                {
+                    "name": "bad",
+                    "metric": "temperature",
+                    "op": ">",
+                    "threshold": 85,
+                    "message": "{temperature}",
+                }
+            )
+
+    def test_load_rules_rejects_malformed_files_and_thresholds(self):
+        with tempfile.TemporaryDirectory() as directory:
+            broken = os.path.join(directory, "broken.yaml")
+            with open(broken, "w") as f:
+                f.write("rules: [unclosed\n")
+            quoted = os.path.join(directory, "quoted.toml")
+            with open(quoted, "w") as f:
+                f.write(
+                    '[[rules]]\nname = "hot"\nmetric = "temperature"\n'
+                    'op = ">"\nthreshold = "85"\n'
+                )
+            duration = os.path.join(directory, "duration.toml")
+            with open(duration, "w") as f:
+                f.write(
+                    '[[rules]]\nname = "hot"\nmetric = "temperature"\n'
+                    'op = ">"\nthreshold = 85\nfor = "60"\n'
+                )
+            negative = os.path.join(directory, "negative.toml")
+            with open(negative, "w") as f:
+                f.write(
+                    '[[rules]]\nname = "hot"\nmetric = "temperature"\n'
+                    'op = ">"\nthreshold = 85\nfor = -5\n'
+                )
+            severity = os.path.join(directory, "severity.toml")
+            with open(severity, "w") as f:
+                f.write(
+                    '[[rules]]\nname = "hot"\nmetric = "temperature"\n'
+                    'op = ">"\nthreshold = 85\nseverity = 2\n'
+                )
+            for path in (broken, quoted, duration, negative, severity):
+                with self.assertRaises(RuleConfigError):
+                    load_rules(path)
+
+    def test_compound_rule_uses_process_counts(self):
+        gpus = [
+            {"index": str(i), "pci_bus_id": f"0000:0{i}:00.0", "gpu_utilization": "2"}
+            for i in range(2)
+        ]
+        for gpu in gpus:
+            for field in ("memory_total", "memory_free", "memory_used"):
+                gpu[field] = "100"
+            for field in (
+                "memory_utilization",
+                "temperature",
+                "power_draw",
+                "power_limit",
+                "sm_clock",
+                "memory_clock",
+                "pcie_link_gen_current",
+                "pcie_link_gen_max",
+            ):
+                gpu[field] = "[N/A]"
+        sample = gpu_metric_columns(gpus, [{"gpu_bus_id": "0000:01:00.0", "pid": 1}])
+        self.assertEqual(sample["compute_processes"], [0, 1])
+        self.assertEqual(sample["temperature"], [None, None])
+
+        rule = Rule.from_dict(
+            {
+                "name": "idle-but-held",
+                "conditions": [
+                    {"metric": "gpu_utilization", "op": "<", "threshold": 10},
+                    {"metric": "compute_processes", "op": ">", "threshold": 0},
+                ],
+            }
+        )
+        alerts = RuleEngine([rule]).evaluate(sample, now=0)
+        self.assertEqual([alert.gpu for alert in alerts], ["1"])
+
+
+class TestProcessTracker(unittest.TestCase):
+    def test_joins_gpu_processes_and_caches_process_objects(self):
+        tracker = ProcessTracker()
+        gpus = [{"index": "0", "pci_bus_id": "00000000:01:00.0"}]
+        gpu_processes = [
+            {"gpu_bus_id": "00000000:01:00.0", "pid": os.getpid(), "used_memory": "512"}
+        ]
+        rows = tracker.sample(gpu_processes, gpus, top_n=3, sort_by="gpu_memory_mb")
+        self.assertEqual(rows[0]["pid"], os.getpid())
+        self.assertEqual(rows[0]["gpus"], ["0"])
+        self.assertEqual(rows[0]["gpu_memory_mb"], 512.0)
+        self.assertGreater(rows[0]["rss_mb"], 0)
+
+        key = (os.getpid(), psutil.Process().create_time())
+        cached = tracker.processes[key]
+        rows = tracker.sample(top_n=5)
+        self.assertIs(tracker.processes[key], cached)
+        self.assertLessEqual(len(rows), 5)
+        with self.assertRaises(ValueError):
+            tracker.sample(sort_by="name")
+
+    def test_reused_pid_is_not_shown_with_stale_command_line(self):
+        tracker = ProcessTracker()
+        # A process that held this PID earlier, with an older create time
+        stale = (os.getpid(), psutil.Process().create_time() - 100)
+        tracker.processes[stale] = MagicMock()
+        tracker.cmdlines[stale] = "previous-owner --of-this-pid"
+        gpu_processes = [{"gpu_bus_id": "bus", "pid": os.getpid(), "used_memory": "1"}]
+        rows = tracker.sample(gpu_processes, top_n=1, sort_by="gpu_memory_mb")
+        self.assertEqual(rows[0]["pid"], os.getpid())
+        self.assertNotEqual(rows[0]["cmdline"], "previous-owner --of-this-pid")
+        self.assertNotIn(stale, tracker.processes)
+        self.assertNotIn(stale, tracker.cmdlines)
+
+
+class TestWatch(unittest.TestCase):
+    def test_json_lines_are_written_in_batches(self):
+        sampler = MagicMock()
+        sampler.snapshot.side_effect = [{"tick": i} for i in range(5)]
+        stream = io.StringIO()
+        stream.write = MagicMock(wraps=stream.write)
+
+        watch(sampler, 0, output="json", batch=2, count=5, stream=stream)
+
+        self.assertEqual(stream.write.call_count, 3)
+        lines = stream.getvalue().splitlines()
+        self.assertEqual([json.loads(line)["tick"] for line in lines], [0, 1, 2, 3, 4])
+        sampler.start.assert_called_once()
+        sampler.stop.assert_called_once()
+
+    def test_stall_skips_missed_ticks(self):
+        ticks = []
+
+        def snapshot():
+            ticks.append(time.monotonic())
+            if len(ticks) == 1:
+                time.sleep(0.5)  # a stall spanning five ticks
+            return {"tick": len(ticks)}
+
+        sampler = MagicMock()
+        sampler.snapshot.side_effect = snapshot
+        watch(sampler, 0.1, output="json", count=3, stream=io.StringIO())
+        gaps = [b - a for a, b in zip(ticks, ticks[1:])]
+        self.assertGreater(min(gaps), 0.05)
+
+    def test_sigterm_flushes_buffered_snapshots(self):
+        def snapshot():
+            if sampler.snapshot.call_count == 3:
+                os.kill(os.getpid(), signal.SIGTERM)
+            return {"tick": sampler.snapshot.call_count}
+
+        sampler = MagicMock()
+        sampler.snapshot.side_effect = snapshot
+        stream = io.StringIO()
+        previous = signal.getsignal(signal.SIGTERM)
+
+        watch(sampler, 0.01, output="json", batch=50, stream=stream)
+
+        lines = stream.getvalue().splitlines()
+        self.assertEqual([json.loads(line)["tick"] for line in lines], [1, 2])
+        sampler.stop.assert_called_once()
+        self.assertIs(signal.getsignal(signal.SIGTERM), previous)
+
+    def test_gpu_stream_reads_looping_nvidia_smi(self):
+        with tempfile.TemporaryDirectory() as tools_dir, patch.dict(
+            os.environ, {"FAKE_GPU_COUNT": "3"}
+        ):
+            install_fake_tools(tools_dir)
+            stream = GpuStream(0.1)
+            stream.start()
+            try:
+                initial = stream.read()
+                deadline = time.monotonic() + 10
+                while stream.read() is initial and time.monotonic() < deadline:
+                    time.sleep(0.05)
+                gpus = stream.read()
+            finally:
+                stream.stop()
+        # The one-shot query seeds the reading, the loop then replaces it
+        self.assertEqual(len(initial), 3)
+        self.assertIsNot(gpus, initial)
+        self.assertEqual([gpu["index"] for gpu in gpus], ["0", "1", "2"])
+
+    def test_gpu_stream_drops_stale_readings(self):
+        stream = GpuStream(0.1, stale_after=0.2)
+        stream.latest = [{"index": "0"}]
+        stream.updated_at = time.monotonic()
+        self.assertEqual(stream.read(), [{"index": "0"}])
+        stream.updated_at -= 1
+        self.assertEqual(stream.read(), [])
+
+
+class TestProbes(unittest.TestCase):
+    def test_resolve_orders_dependencies_and_rejects_cycles(self):
+        registry = ProbeRegistry(
+            [
+                Probe("report", lambda inputs: None, requires=("cuda", "cpu")),
+                Probe("cuda", lambda inputs: None),
+                Probe("cpu", lambda inputs: None),
+            ]
+        )
+        names = [probe.name for probe in registry.resolve(["report"])]
+        self.assertEqual(names[-1], "report")
+        self.assertEqual(set(names), {"report", "cuda", "cpu"})
+        registry.register(Probe("cpu", lambda inputs: None, requires=("report",)))
+        with self.assertRaises(ProbeError):
+            registry.resolve(["report"])
+
+    def test_independent_probes_run_concurrently_and_share_results(self):
+        def slow(value):
+            def run(inputs):
+                time.sleep(0.3)
+                return value
+
+            return run
+
+        def fail(inputs):
+            raise RuntimeError("broken")
+
+        registry = ProbeRegistry(
+            [
+                Probe("a", slow(2)),
+                Probe("b", slow(3)),
+                Probe("sum", lambda inputs: inputs["a"] + inputs["b"], ("a", "b")),
+                Probe("broken", fail),
+                Probe("after_broken", lambda inputs: 1, ("broken",)),
+                Probe("hung", lambda inputs: time.sleep(2), timeout=0.2),
+            ]
+        )
+        start = time.monotonic()
+        results = run_probes(registry)
+        self.assertLess(time.monotonic() - start, 1.0)
+        self.assertEqual(results["sum"].value, 5)
+        self.assertEqual(results["broken"].status, "error")
+        self.assertEqual(results["after_broken"].status, "skipped")
+        self.assertEqual(results["hung"].status, "timeout")
+
+    def test_timed_out_probe_does_not_delay_exit(self):
+        script = (
+            "import time\n"
+            "from probes import Probe, ProbeRegistry, run_probes\n"
+            "probe = Probe('hung', lambda inputs: time.sleep(30), timeout=0.2)\n"
+            "print(run_probes(ProbeRegistry([probe]))['hung'].status)\n"
+        )
+        start = time.monotonic()
+        output = subprocess.check_output(
+            [sys.executable, "-c", script],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            timeout=20,
+        )
+        self.assertEqual(output.decode().strip(), "timeout")
+        self.assertLess(time.monotonic() - start, 10)
+
+    def test_process_probe_runs_in_fresh_interpreter(self):
+        registry = ProbeRegistry([Probe("cpu", cpu_probe, executor="process")])
+        result = run_probes(registry)["cpu"]
+        self.assertEqual(result.status, "ok", result.error)
+        self.assertIn("cores", result.value)
+
+    @patch("probes.metadata.entry_points")
+    def test_discover_registers_entry_point_probes(self, mock_entry_points):
+        plugin = Probe("plugin", lambda inputs: "ok")
+        entry_point = MagicMock()
+        entry_point.load.return_value = [plugin]
+        mock_entry_points.return_value = [entry_point]
+        registry = ProbeRegistry().discover()
+        mock_entry_points.assert_called_once_with(group="mlframework_checker.probes")
+        self.assertIs(registry.probes["plugin"], plugin)
+
+
+class TestColdStart(unittest.TestCase):
+    def test_profile_framework_in_fresh_interpreters(self):
+        result = coldstart.profile_framework("decimal", runs=2, warmup=0)
+        self.assertEqual(len(result["samples"]["import_s"]), 2)
+        self.assertGreater(result["rss_mb"], 0)
+        self.assertGreaterEqual(result["threads_after_import"], 1)
+        # The breakdown covers only what importing decimal pulled in
+        self.assertIn("_decimal", result["packages"])
+        self.assertNotIn("json", result["packages"])
+        self.assertIsNone(coldstart.profile_framework("no_such_framework", runs=1))
+
+    def test_configuration_comes_from_profiled_interpreter(self):
+        completed = subprocess.CompletedProcess(
+            [], 0, stdout='{"python": "3.9.18", "torch": "2.2.0"}', stderr=""
+        )
+        with patch("coldstart.subprocess.run", return_value=completed) as mock_run:
+            config = coldstart.interpreter_configuration("/opt/venv/bin/python")
+        self.assertEqual(config, {"python": "3.9.18", "torch": "2.2.0"})
+        self.assertEqual(mock_run.call_args[0][0][0], "/opt/venv/bin/python")
+        # The real script runs in any interpreter and covers the tracked keys
+        config = coldstart.interpreter_configuration()
+        self.assertTrue({"python", "platform", "torch", "numpy"} <= set(config))
+
+    def test_compare_needs_a_significant_slowdown(self):
+        def result(version, import_times):
+            return {
+                "version": version,
+                "import_s": sorted(import_times)[len(import_times) // 2],
+                "samples": {"import_s": import_times},
+            }
+
+        baseline = {"torch": result("2.2", [1.0, 1.1, 1.0, 1.05, 1.02])}
+        slower = {"torch": result("2.3", [1.5, 1.6, 1.55, 1.52, 1.58])}
+        noisy = {"torch": result("2.3", [0.9, 1.6, 1.0, 1.5, 1.05])}
+        regressions = coldstart.compare(slower, baseline)
+        self.assertEqual(len(regressions), 1)
+        self.assertIn("2.2 -> 2.3", regressions[0])
+        self.assertEqual(coldstart.compare(noisy, baseline), [])
+        missing = coldstart.compare({"torch": None}, baseline)
+        self.assertEqual(missing, ["torch: not installed (baseline has 2.2)"])
+
+    def test_too_few_runs_against_baseline_are_rejected(self):
+        self.assertEqual(coldstart.minimum_runs(3), 4)
+        self.assertEqual(coldstart.minimum_runs(5), 2)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "baseline.json")
+            with open(path, "w") as f:
+                json.dump({"torch": {"version": "2.2", "runs": 3}}, f)
+            with patch("coldstart.profile_framework") as profile, patch(
+                "sys.stderr", io.StringIO()
+            ), self.assertRaises(SystemExit):
+                coldstart.main(["torch", "--runs", "3", "--baseline", path])
+        profile.assert_not_called()
+
 
 if __name__ == "__main__":
     unittest.main()